@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import argparse
-from typing import List, Optional, Mapping, Dict, cast
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional, Mapping
 
 import pandas as pd
 
@@ -15,34 +16,84 @@ def _split_columns(arg: Optional[str]) -> Optional[List[str]]:
     return [c.strip() for c in arg.split(",") if c.strip()]
 
 
+def _read_frame(path: str) -> pd.DataFrame:
+    if path.lower().endswith(".parquet"):
+        return pd.read_parquet(path)
+    # The multithreaded pyarrow parser is much faster but pyarrow is optional
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return pd.read_csv(path)
+    return pd.read_csv(path, engine="pyarrow")
+
+
+def _write_frame(df: pd.DataFrame, path: str, fmt: str) -> None:
+    if fmt == "parquet":
+        df.to_parquet(path, index=False, compression="zstd")
+    else:
+        df.to_csv(path, index=False)
+
+
+def _format_metrics(metrics: Mapping[str, Mapping[str, object]]) -> str:
+    if not metrics:
+        return "(none)"
+    # One row per target, one column per metric, formatted in a single pass
+    return pd.DataFrame.from_dict(
+        {target: dict(m) for target, m in metrics.items()}, orient="index"
+    ).round(4).to_string()
+
+
+def _write_json(payload: Mapping[str, Any], path: str) -> None:
+    # orjson handles NumPy scalars natively but is only installed with the api extra
+    try:
+        import orjson
+    except ImportError:
+        import json
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2)
+        return
+    with open(path, "wb") as fb:
+        fb.write(orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2))
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Fuse two datasets statistically using overlapping features and ML models."
     )
-    parser.add_argument("--a", dest="a_path", required=True, help="CSV path to dataset A")
-    parser.add_argument("--b", dest="b_path", required=True, help="CSV path to dataset B")
-    parser.add_argument("--out-fused", dest="out_fused", required=True, help="Output CSV for fused dataset")
-    parser.add_argument("--out-a", dest="out_a", required=False, help="Output CSV for enriched A")
-    parser.add_argument("--out-b", dest="out_b", required=False, help="Output CSV for enriched B")
+    parser.add_argument("--a", dest="a_path", required=True, help="CSV or Parquet (.parquet) path to dataset A")
+    parser.add_argument("--b", dest="b_path", required=True, help="CSV or Parquet (.parquet) path to dataset B")
+    parser.add_argument("--out-fused", dest="out_fused", required=True, help="Output path for fused dataset (see --format)")
+    parser.add_argument("--out-a", dest="out_a", required=False, help="Output path for enriched A")
+    parser.add_argument("--out-b", dest="out_b", required=False, help="Output path for enriched B")
     parser.add_argument("--overlap", dest="overlap", required=False, help="Comma-separated overlap feature names")
     parser.add_argument("--targets-a", dest="targets_a", required=False, help="Comma-separated targets from A")
     parser.add_argument("--targets-b", dest="targets_b", required=False, help="Comma-separated targets from B")
     parser.add_argument("--no-pycaret", dest="no_pycaret", action="store_true", help="Disable PyCaret even if installed")
     parser.add_argument("--metrics-out", dest="metrics_out", required=False, help="Output JSON path for metrics summary")
     parser.add_argument("--sparse-onehot", dest="sparse_onehot", action="store_true", help="Use sparse one-hot encoding to reduce memory usage")
+    parser.add_argument("--categorical-encoding", dest="categorical_encoding", choices=["onehot", "ordinal"], default="onehot", help="Encode categoricals as one-hot columns or as one ordinal code column each")
     parser.add_argument("--cv-splits", dest="cv_splits", type=int, default=3, help="Number of CV splits for metrics")
     parser.add_argument("--n-estimators", dest="n_estimators", type=int, default=300, help="Number of trees for RandomForest (sklearn backend)")
+    parser.add_argument("--max-depth", dest="max_depth", type=int, default=16, help="Maximum tree depth for RandomForest (0 for unlimited)")
+    parser.add_argument("--min-samples-leaf", dest="min_samples_leaf", type=int, default=1, help="Minimum samples per leaf for RandomForest")
+    parser.add_argument("--model-family", dest="model_family", choices=["rf", "hgbt", "lgbm"], default="rf", help="Model family for the sklearn backend: RandomForest, HistGradientBoosting or LightGBM")
+    parser.add_argument("--format", dest="out_format", choices=["csv", "parquet"], default="csv", help="Output file format (parquet requires pyarrow)")
     args = parser.parse_args()
 
-    df_a = pd.read_csv(args.a_path)
-    df_b = pd.read_csv(args.b_path)
+    df_a = _read_frame(args.a_path)
+    df_b = _read_frame(args.b_path)
 
     config = FusionConfig(
         prefer_pycaret=not args.no_pycaret,
         random_state=42,
         cv_splits=args.cv_splits,
         n_estimators=args.n_estimators,
+        max_depth=args.max_depth or None,
+        min_samples_leaf=args.min_samples_leaf,
         use_sparse_onehot=args.sparse_onehot,
+        model_family=args.model_family,
+        categorical_encoding=args.categorical_encoding,
     )
 
     result = fuse_datasets(
@@ -56,32 +107,29 @@ def main() -> None:
         config=config,
     )
 
-    result.fused.to_csv(args.out_fused, index=False)
+    outputs = [(result.fused, args.out_fused)]
     if args.out_a:
-        result.a_enriched.to_csv(args.out_a, index=False)
+        outputs.append((result.a_enriched, args.out_a))
     if args.out_b:
-        result.b_enriched.to_csv(args.out_b, index=False)
+        outputs.append((result.b_enriched, args.out_b))
+    # Writers release the GIL for most of their work, so overlap the outputs
+    with ThreadPoolExecutor(max_workers=len(outputs)) as pool:
+        futures = [pool.submit(_write_frame, df, path, args.out_format) for df, path in outputs]
+        for future in futures:
+            future.result()
 
     # Print a concise metrics summary to stdout
     print("A->B metrics:")
-    for target, metrics in result.metrics_a_to_b.items():
-        m = cast(Dict[str, float], dict(metrics))
-        print(target, {k: round(val, 4) for k, val in m.items()})
+    print(_format_metrics(result.metrics_a_to_b))
     print("B->A metrics:")
-    for target, metrics in result.metrics_b_to_a.items():
-        m = cast(Dict[str, float], dict(metrics))
-        print(target, {k: round(val, 4) for k, val in m.items()})
+    print(_format_metrics(result.metrics_b_to_a))
 
     if args.metrics_out:
-        import json
-
         metrics_payload = {
             "a_to_b": result.metrics_a_to_b,
             "b_to_a": result.metrics_b_to_a,
         }
-        with open(args.metrics_out, "w", encoding="utf-8") as f:
-            json.dump(metrics_payload, f, indent=2)
-
+        _write_json(metrics_payload, args.metrics_out)
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Literal, Optional
 
 
 @dataclass
@@ -16,12 +17,34 @@ class FusionConfig:
     random_state: int = 42
 
     # Modeling
+    # "rf": RandomForest; "hgbt": HistGradientBoosting; "lgbm": LightGBM
+    # (falls back to "hgbt" when lightgbm is not installed)
+    model_family: Literal["rf", "hgbt", "lgbm"] = "rf"
     cv_splits: int = 3
     n_estimators: int = 300
+    # Random forest size caps; unbounded trees grow roughly one leaf per
+    # sample, which inflates memory and predict time on large datasets
+    max_depth: Optional[int] = 16
+    min_samples_leaf: int = 1
     n_jobs: int = 1
     use_sparse_onehot: bool = True
+    # "onehot": one indicator column per category; "ordinal": one integer
+    # code column per feature, which keeps forests narrow on wide categoricals
+    categorical_encoding: Literal["onehot", "ordinal"] = "onehot"
+    # Use oneDAL-accelerated forests from sklearnex when it is installed
+    use_sklearnex: bool = False
+    # Export fitted sklearn estimators to ONNX and predict with ONNX Runtime
+    # (requires skl2onnx and onnxruntime; ignored when they are missing)
+    use_onnx: bool = False
+    # Predict with Treelite's compiled tree evaluator (requires treelite;
+    # use_onnx takes precedence when both are enabled)
+    use_treelite: bool = False
 
     # Safety/performance
     max_category_cardinality: int = 100
     warn_on_high_cardinality: bool = True
 
+    # Caching: reuse fitted models and CV metrics for identical inputs
+    cache_models: bool = False
+    model_cache_size: int = 32
+
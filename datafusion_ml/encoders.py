@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+
+
+class FastOneHotEncoder(TransformerMixin, BaseEstimator):
+    """Dense one-hot encoder writing ``int8`` indicator columns.
+
+    Behaves like ``OneHotEncoder(handle_unknown="ignore", sparse_output=False)``
+    (sorted categories, unknown values encode as all zeros) but fills one
+    preallocated ``int8`` matrix from category codes instead of building a
+    ``float64`` array per fit.
+    """
+
+    def fit(self, X: Any, y: Any = None) -> FastOneHotEncoder:
+        X = np.asarray(X, dtype=object)
+        self.n_features_in_ = X.shape[1]
+        self.categories_ = [np.unique(X[:, j]) for j in range(X.shape[1])]
+        return self
+
+    def transform(self, X: Any) -> npt.NDArray[np.int8]:
+        X = np.asarray(X, dtype=object)
+        n_rows = X.shape[0]
+        out = np.zeros((n_rows, sum(len(c) for c in self.categories_)), dtype=np.int8)
+        rows = np.arange(n_rows)
+        offset = 0
+        for j, cats in enumerate(self.categories_):
+            codes = pd.Categorical(X[:, j], categories=cats).codes
+            known = codes >= 0
+            out[rows[known], offset + codes[known]] = 1
+            offset += len(cats)
+        return out
+
+    def get_feature_names_out(self, input_features: Any = None) -> npt.NDArray[Any]:
+        if input_features is None:
+            input_features = [f"x{j}" for j in range(self.n_features_in_)]
+        return np.asarray(
+            [f"{name}_{cat}" for name, cats in zip(input_features, self.categories_) for cat in cats],
+            dtype=object,
+        )
@@ -1,18 +1,27 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, Iterable, List, Optional, Sequence, Tuple, cast
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, cast
 import logging
 
+import joblib
+import numpy as np
+import numpy.typing as npt
 import pandas as pd
+from joblib import Parallel, delayed
 
 from .modeling import (
+    EncodedFeatures,
+    Folds,
+    ModelTrainer,
     ProblemType,
     TrainedModel,
     detect_problem_type,
     predict,
     train_model,
     cross_validate_metrics,
+    encode_features,
+    kfold_indices,
     ClassificationMetrics,
     RegressionMetrics,
     get_trainer,
@@ -40,13 +49,13 @@ def _infer_overlap_features(
     df_b: pd.DataFrame,
     exclude: Optional[Iterable[str]] = None,
 ) -> List[str]:
-    exclude_set = set(exclude or [])
-    overlap = sorted((set(df_a.columns) & set(df_b.columns)) - exclude_set)
-    return overlap
+    # Index set operations reuse the Index hash tables and return sorted results
+    overlap = df_a.columns.intersection(df_b.columns).difference(list(exclude or []))
+    return overlap.sort_values().tolist()
 
 
 def _exclusive_columns(df_left: pd.DataFrame, df_right: pd.DataFrame) -> List[str]:
-    return sorted(list(set(df_left.columns) - set(df_right.columns)))
+    return df_left.columns.difference(df_right.columns).sort_values().tolist()
 
 
 def _is_categorical_column(series: pd.Series) -> bool:
@@ -57,22 +66,238 @@ def _is_categorical_column(series: pd.Series) -> bool:
     )
 
 
+def _codes_for_union(
+    a_vals: npt.NDArray[Any], b_vals: npt.NDArray[Any]
+) -> Tuple[npt.NDArray[np.intp], npt.NDArray[np.intp], npt.NDArray[Any]]:
+    """Factorize two arrays against their sorted union of non-null values.
+
+    Both sides are hashed in a single pass and the codes split back, instead
+    of hashing the values again for every astype(CategoricalDtype). Missing
+    values get code -1.
+    """
+    codes, uniques = pd.factorize(np.concatenate([a_vals, b_vals]), sort=True)
+    n_a = len(a_vals)
+    return codes[:n_a], codes[n_a:], uniques
+
+
 def _coerce_categorical_alignment(
     a: pd.DataFrame, b: pd.DataFrame, columns: Sequence[str]
 ) -> Tuple[pd.DataFrame, pd.DataFrame]:
-    a_aligned = a.copy()
-    b_aligned = b.copy()
-    for c in columns:
-        col_a = a_aligned[c]
-        col_b = b_aligned[c]
-        if _is_categorical_column(col_a) or _is_categorical_column(col_b):
-            combined = pd.concat([col_a, col_b], ignore_index=True)
-            cats = pd.Index(sorted(pd.unique(combined.dropna())))
-            a_aligned[c] = a_aligned[c].astype(pd.CategoricalDtype(categories=cats))
-            b_aligned[c] = b_aligned[c].astype(pd.CategoricalDtype(categories=cats))
+    cat_cols = [
+        c for c in columns if _is_categorical_column(a[c]) or _is_categorical_column(b[c])
+    ]
+    if not cat_cols:
+        # Nothing to align; hand back the inputs instead of copying them
+        return a, b
+    # Shallow copies: only the converted columns get new data, the rest stay shared
+    a_aligned = a.copy(deep=False)
+    b_aligned = b.copy(deep=False)
+    for c in cat_cols:
+        codes_a, codes_b, uniques = _codes_for_union(a[c].to_numpy(), b[c].to_numpy())
+        dtype = pd.CategoricalDtype(categories=pd.Index(uniques))
+        a_aligned[c] = pd.Series(pd.Categorical.from_codes(codes_a, dtype=dtype), index=a.index)
+        b_aligned[c] = pd.Series(pd.Categorical.from_codes(codes_b, dtype=dtype), index=b.index)
     return a_aligned, b_aligned
 
 
+def _stack_column(
+    left: Optional[pd.Series], right: Optional[pd.Series], n_left: int, n_right: int
+) -> pd.Series | npt.NDArray[Any]:
+    """Vertically stack one column, filling the side that lacks it with NaN."""
+    if left is None:
+        left = pd.Series(np.full(n_left, np.nan))
+    if right is None:
+        right = pd.Series(np.full(n_right, np.nan))
+    if (
+        isinstance(left.dtype, np.dtype)
+        and left.dtype == right.dtype
+        and left.dtype.kind in "biufc"
+    ):
+        return np.concatenate([left.to_numpy(), right.to_numpy()])
+    # Mixed or extension dtypes: let pandas apply its usual promotion rules
+    return pd.concat([left, right], ignore_index=True)
+
+
+def _stack_frames(
+    top: pd.DataFrame, bottom: pd.DataFrame, columns: Sequence[str]
+) -> pd.DataFrame:
+    """Column-wise equivalent of concatenating two reindexed frames.
+
+    Builds each output column directly instead of materializing reindexed
+    copies of both frames first, which roughly halves peak memory.
+    """
+    n_top, n_bottom = len(top), len(bottom)
+    out = {
+        col: _stack_column(
+            top[col] if col in top.columns else None,
+            bottom[col] if col in bottom.columns else None,
+            n_top,
+            n_bottom,
+        )
+        for col in columns
+    }
+    return pd.DataFrame(
+        out, index=pd.RangeIndex(n_top + n_bottom), columns=list(columns), copy=False
+    )
+
+
+# Trained models and CV metrics keyed by a hash of (features, target, config).
+# Only consulted when ``FusionConfig.cache_models`` is enabled.
+_MODEL_CACHE: Dict[str, Tuple[TrainedModel, ClassificationMetrics | RegressionMetrics]] = {}
+
+
+def _model_cache_key(
+    X: pd.DataFrame,
+    y: pd.Series,
+    problem: ProblemType,
+    trainer: ModelTrainer,
+    config: FusionConfig,
+) -> str:
+    """Build a content hash identifying a (features, target, config) fit."""
+    # n_jobs and the cache settings themselves do not change the fitted result
+    signature = {
+        k: v
+        for k, v in asdict(config).items()
+        if k not in ("n_jobs", "cache_models", "model_cache_size")
+    }
+    return cast(
+        str,
+        joblib.hash(
+            (
+                tuple(X.columns),
+                tuple(str(dt) for dt in X.dtypes),
+                pd.util.hash_pandas_object(X, index=False).to_numpy(),
+                y.name,
+                str(y.dtype),
+                pd.util.hash_pandas_object(y, index=False).to_numpy(),
+                problem,
+                type(trainer).__name__,
+                sorted(signature.items()),
+            )
+        ),
+    )
+
+
+def _detached(
+    model: TrainedModel, metrics: ClassificationMetrics | RegressionMetrics
+) -> Tuple[TrainedModel, ClassificationMetrics | RegressionMetrics]:
+    """Copy a cache entry so callers cannot change what later hits return.
+
+    The record and its ``extra`` and metrics dicts are copied; the fitted
+    estimator is shared, as refitting it is never done in place.
+    """
+    extra = dict(model.extra) if model.extra is not None else None
+    return replace(model, extra=extra), cast(ClassificationMetrics | RegressionMetrics, dict(metrics))
+
+
+def _store_in_model_cache(
+    key: str,
+    model: TrainedModel,
+    metrics: ClassificationMetrics | RegressionMetrics,
+    config: FusionConfig,
+) -> None:
+    # Evict oldest entries first (dicts preserve insertion order)
+    while _MODEL_CACHE and len(_MODEL_CACHE) >= config.model_cache_size:
+        _MODEL_CACHE.pop(next(iter(_MODEL_CACHE)))
+    _MODEL_CACHE[key] = _detached(model, metrics)
+
+
+def clear_model_cache() -> None:
+    """Drop all models memoized via ``FusionConfig.cache_models``."""
+    _MODEL_CACHE.clear()
+
+
+def _train_one(
+    target: str,
+    X: pd.DataFrame,
+    X_apply: pd.DataFrame,
+    y: pd.Series,
+    problem: ProblemType,
+    trainer: ModelTrainer,
+    config: FusionConfig,
+    encoded: Optional[EncodedFeatures] = None,
+    folds: Optional[Folds] = None,
+) -> Tuple[str, TrainedModel, ClassificationMetrics | RegressionMetrics, npt.NDArray[Any]]:
+    """Train, evaluate and apply the model for a single target."""
+    model = trainer.train(X, y, problem_type=problem, config=config, encoded=encoded)
+    # Evaluate via sklearn CV for consistency
+    metrics = cast(
+        ClassificationMetrics | RegressionMetrics,
+        cross_validate_metrics(X, y, problem, config=config, encoded=encoded, folds=folds),
+    )
+    preds = predict(model, X_apply, encoded=encoded)
+    return target, model, metrics, preds
+
+
+def _fit_direction(
+    X: pd.DataFrame,
+    X_apply: pd.DataFrame,
+    df_source: pd.DataFrame,
+    targets: Sequence[str],
+    problem_type_map: Optional[Dict[str, ProblemType]],
+    trainer: ModelTrainer,
+    config: FusionConfig,
+) -> Tuple[
+    Dict[str, TrainedModel],
+    Dict[str, ClassificationMetrics | RegressionMetrics],
+    Dict[str, npt.NDArray[Any]],
+]:
+    """Fit one model per target on ``X`` and predict on ``X_apply``.
+
+    Targets are independent of each other, so with ``config.n_jobs != 1`` they
+    are dispatched to a joblib pool. The estimators inside each task are then
+    forced to ``n_jobs=1`` to avoid oversubscribing the machine.
+    """
+    tasks = []
+    cached: Dict[str, Tuple[TrainedModel, ClassificationMetrics | RegressionMetrics]] = {}
+    cache_keys: Dict[str, str] = {}
+    for target in targets:
+        y = df_source[target]
+        problem = (problem_type_map or {}).get(target) or trainer.infer_problem_type(y)
+        if config.cache_models:
+            key = _model_cache_key(X, y, problem, trainer, config)
+            cache_keys[target] = key
+            hit = _MODEL_CACHE.get(key)
+            if hit is not None:
+                cached[target] = _detached(*hit)
+                continue
+        tasks.append((target, y, problem))
+
+    # Preprocessing and KFold splits are target-independent: compute them once
+    encoded = encode_features(X, X_apply, config=config) if tasks else None
+    folds = kfold_indices(len(X), config=config) if tasks else None
+
+    if config.n_jobs != 1 and len(tasks) > 1:
+        inner_config = replace(config, n_jobs=1)
+        results = Parallel(n_jobs=config.n_jobs, backend="loky")(
+            delayed(_train_one)(
+                target, X, X_apply, y, problem, trainer, inner_config, encoded, folds
+            )
+            for target, y, problem in tasks
+        )
+    else:
+        results = [
+            _train_one(target, X, X_apply, y, problem, trainer, config, encoded, folds)
+            for target, y, problem in tasks
+        ]
+
+    by_target = {res[0]: res for res in results}
+    for target, (model, target_metrics) in cached.items():
+        by_target[target] = (target, model, target_metrics, predict(model, X_apply))
+
+    models: Dict[str, TrainedModel] = {}
+    metrics: Dict[str, ClassificationMetrics | RegressionMetrics] = {}
+    preds: Dict[str, npt.NDArray[Any]] = {}
+    for target in targets:
+        _, model, target_metrics, target_preds = by_target[target]
+        models[target] = model
+        metrics[target] = target_metrics
+        preds[target] = target_preds
+        if config.cache_models and target not in cached:
+            _store_in_model_cache(cache_keys[target], model, target_metrics, config)
+    return models, metrics, preds
+
+
 def fuse_datasets(
     df_a: pd.DataFrame,
     df_b: pd.DataFrame,
@@ -92,11 +317,13 @@ def fuse_datasets(
             random_state=random_state,
         )
 
+    cols_a = df_a.columns
+    cols_b = df_b.columns
     if overlap_features is None:
         exclude = set(targets_from_a or []) | set(targets_from_b or [])
         overlap_features = _infer_overlap_features(df_a, df_b, exclude=exclude)
     else:
-        overlap_features = [c for c in overlap_features if c in df_a.columns and c in df_b.columns]
+        overlap_features = [c for c in overlap_features if c in cols_a and c in cols_b]
 
     if len(overlap_features) == 0:
         raise OverlapError(
@@ -120,9 +347,16 @@ def fuse_datasets(
 
     # Cardinality checks
     if config.warn_on_high_cardinality:
-        for col in overlap_features:
-            if not pd.api.types.is_numeric_dtype(a_feat[col]):
-                cardinality = int(pd.Index(pd.concat([a_feat[col], b_feat[col]], ignore_index=True).dropna().unique()).size)
+        non_numeric_cols = [
+            c for c in overlap_features if not pd.api.types.is_numeric_dtype(a_feat[c])
+        ]
+        if non_numeric_cols:
+            # One stacked frame and a single nunique pass instead of a concat per column
+            combined = pd.concat(
+                [a_feat[non_numeric_cols], b_feat[non_numeric_cols]], ignore_index=True
+            )
+            cardinalities = combined.nunique(dropna=True)
+            for col, cardinality in cardinalities.items():
                 if cardinality > config.max_category_cardinality:
                     logger.warning(
                         "High cardinality detected for column '%s': %d categories (threshold=%d). Consider enabling sparse one-hot or reducing categories.",
@@ -134,40 +368,27 @@ def fuse_datasets(
     trainer = get_trainer(config)
 
     # Train models A -> B
-    models_a_to_b: Dict[str, TrainedModel] = {}
-    metrics_a_to_b: Dict[str, ClassificationMetrics | RegressionMetrics] = {}
-    b_pred = df_b.copy()
-    for target in targets_from_a:
-        y = df_a[target]
-        problem = (problem_type_map or {}).get(target) or trainer.infer_problem_type(y)
-        model = trainer.train(a_feat, y, problem_type=problem, config=config)
-        models_a_to_b[target] = model
-        # Evaluate via sklearn CV for consistency
-        metrics_a_to_b[target] = cast(ClassificationMetrics | RegressionMetrics, cross_validate_metrics(a_feat, y, problem, config=config))
-        preds = predict(model, b_feat)
+    models_a_to_b, metrics_a_to_b, preds_b = _fit_direction(
+        a_feat, b_feat, df_a, targets_from_a, problem_type_map, trainer, config
+    )
+    # Only copy when predictions are actually added; otherwise B is returned as-is
+    b_pred = df_b.copy() if preds_b else df_b
+    for target, preds in preds_b.items():
         col_name = target if target not in b_pred.columns else f"{target}_pred"
         b_pred[col_name] = preds
 
     # Train models B -> A
-    models_b_to_a: Dict[str, TrainedModel] = {}
-    metrics_b_to_a: Dict[str, ClassificationMetrics | RegressionMetrics] = {}
-    a_pred = df_a.copy()
-    for target in targets_from_b:
-        y = df_b[target]
-        problem = (problem_type_map or {}).get(target) or trainer.infer_problem_type(y)
-        model = trainer.train(b_feat, y, problem_type=problem, config=config)
-        models_b_to_a[target] = model
-        metrics_b_to_a[target] = cast(ClassificationMetrics | RegressionMetrics, cross_validate_metrics(b_feat, y, problem, config=config))
-        preds = predict(model, a_feat)
+    models_b_to_a, metrics_b_to_a, preds_a = _fit_direction(
+        b_feat, a_feat, df_b, targets_from_b, problem_type_map, trainer, config
+    )
+    a_pred = df_a.copy() if preds_a else df_a
+    for target, preds in preds_a.items():
         col_name = target if target not in a_pred.columns else f"{target}_pred"
         a_pred[col_name] = preds
 
     # Create fused dataset: union of columns and vertical concat
-    all_columns = sorted(list(set(a_pred.columns) | set(b_pred.columns)))
-    fused = pd.concat([
-        a_pred.reindex(columns=all_columns),
-        b_pred.reindex(columns=all_columns),
-    ], ignore_index=True)
+    all_columns = a_pred.columns.union(b_pred.columns).sort_values().tolist()
+    fused = _stack_frames(a_pred, b_pred, all_columns)
 
     return FusionResult(
         fused=fused,
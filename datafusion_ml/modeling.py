@@ -1,20 +1,28 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, Literal, Optional, Tuple, Protocol, TypedDict, Union, cast
+from dataclasses import dataclass, field, replace
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Literal, Optional, Tuple, Protocol, TypedDict, Union, cast
+import logging
 
+import joblib
 import numpy as np
 import numpy.typing as npt
 import pandas as pd
 
-from sklearn.compose import ColumnTransformer
-from sklearn.impute import SimpleImputer
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import OneHotEncoder
-from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
-from sklearn.model_selection import cross_validate, StratifiedKFold, KFold
-
 from .config import FusionConfig
+from .errors import ConfigurationError
+
+if TYPE_CHECKING:
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import Pipeline
+
+# sklearn is imported inside the functions that build or evaluate models: it
+# takes about a second to import, which the API and CLI should not pay until
+# the first fusion actually runs.
+
+
+logger = logging.getLogger(__name__)
 
 
 ProblemType = Literal["classification", "regression"]
@@ -35,7 +43,9 @@ class RegressionMetrics(TypedDict, total=False):
     mae: float
 
 
+@lru_cache(maxsize=None)
 def is_pycaret_available() -> bool:
+    # Cached so a missing install is not re-probed on every fusion call
     try:
         import pycaret  # noqa: F401
         return True
@@ -43,14 +53,51 @@ def is_pycaret_available() -> bool:
         return False
 
 
+@lru_cache(maxsize=None)
+def _get_rf_classes(use_sklearnex: bool = False) -> Tuple[Any, Any]:
+    """Return the (classifier, regressor) random forest classes to build.
+
+    With ``use_sklearnex`` the oneDAL-backed forests from the Intel Extension
+    for Scikit-learn are used when that package is installed; they are drop-in
+    replacements, so this falls back to stock sklearn otherwise. The result
+    is cached per flag, so a missing package is reported only once.
+    """
+    if use_sklearnex:
+        try:
+            from sklearnex.ensemble import (
+                RandomForestClassifier as ExRandomForestClassifier,
+                RandomForestRegressor as ExRandomForestRegressor,
+            )
+            return ExRandomForestClassifier, ExRandomForestRegressor
+        except ImportError:
+            logger.warning(
+                "use_sklearnex=True but scikit-learn-intelex is not installed; "
+                "using stock scikit-learn random forests"
+            )
+    from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+
+    return RandomForestClassifier, RandomForestRegressor
+
+
+def warm_pycaret() -> None:
+    """Import the PyCaret experiment modules ahead of the first training call.
+
+    PyCaret is otherwise only imported lazily inside :class:`PyCaretTrainer`,
+    which keeps it off the import path of the CLI and the API.
+    """
+    if is_pycaret_available():
+        import pycaret.classification  # noqa: F401
+        import pycaret.regression  # noqa: F401
+
+
 def detect_problem_type(target_series: pd.Series) -> ProblemType:
     # Float-Ziele sind i.d.R. Regression
     if pd.api.types.is_float_dtype(target_series):
         return "regression"
     # Integer-Ziele: wenige eindeutige Klassen -> Klassifikation
     if pd.api.types.is_integer_dtype(target_series):
-        n_unique = target_series.dropna().nunique()
-        n_obs = target_series.dropna().shape[0]
+        n_unique = target_series.nunique(dropna=True)
+        n_obs = int(target_series.notna().sum())
         if n_unique <= 20 and n_unique <= max(2, int(0.2 * n_obs)):
             return "classification"
         return "regression"
@@ -58,65 +105,183 @@ def detect_problem_type(target_series: pd.Series) -> ProblemType:
     return "classification"
 
 
-def build_sklearn_pipeline(
+def _to_float32(X: Any) -> npt.NDArray[np.float32]:
+    # Forests split on float32 thresholds anyway; casting here halves the
+    # memory of the encoded matrix instead of sklearn casting a copy per fit
+    return np.asarray(X, dtype=np.float32)
+
+
+def build_preprocessor(
     X: pd.DataFrame,
-    problem_type: ProblemType,
     *,
     config: Optional[FusionConfig] = None,
-) -> Pipeline:
+) -> ColumnTransformer:
+    from sklearn.compose import ColumnTransformer
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import FunctionTransformer, OneHotEncoder, OrdinalEncoder
+
+    from .encoders import FastOneHotEncoder
+
     if config is None:
         config = FusionConfig()
-    categorical_cols = [c for c in X.columns if not pd.api.types.is_numeric_dtype(X[c])]
-    numeric_cols = [c for c in X.columns if pd.api.types.is_numeric_dtype(X[c])]
+    # One dtype pass over the frame; bools count as numeric like is_numeric_dtype
+    numeric_index = X.select_dtypes(include=["number", "bool"]).columns
+    numeric_cols = numeric_index.tolist()
+    categorical_cols = X.columns.difference(numeric_index, sort=False).tolist()
+
+    if config.model_family != "rf":
+        # Boosted trees handle NaN natively and split on ordinal codes, so
+        # there is no imputation and no one-hot expansion
+        return ColumnTransformer(
+            transformers=[
+                (
+                    "categorical",
+                    OrdinalEncoder(handle_unknown="use_encoded_value", unknown_value=np.nan),
+                    categorical_cols,
+                ),
+                ("numeric", "passthrough", numeric_cols),
+            ]
+        )
 
+    encoder: Tuple[str, Any]
+    if config.categorical_encoding == "ordinal":
+        # One code column per feature; unseen categories map to -1
+        encoder = (
+            "ordinal",
+            OrdinalEncoder(
+                handle_unknown="use_encoded_value", unknown_value=-1, dtype=np.float32
+            ),
+        )
+    elif config.use_sparse_onehot:
+        encoder = (
+            "onehot",
+            OneHotEncoder(handle_unknown="ignore", sparse_output=True, dtype=np.float32),
+        )
+    else:
+        encoder = ("onehot", FastOneHotEncoder())
     categorical_transformer = Pipeline(
         steps=[
             ("imputer", SimpleImputer(strategy="most_frequent")),
-            (
-                "onehot",
-                OneHotEncoder(
-                    handle_unknown="ignore",
-                    sparse_output=config.use_sparse_onehot,
-                ),
-            ),
+            encoder,
         ]
     )
 
     numeric_transformer = Pipeline(
         steps=[
             ("imputer", SimpleImputer(strategy="median")),
+            ("downcast", FunctionTransformer(_to_float32, feature_names_out="one-to-one")),
         ]
     )
 
-    preprocessor = ColumnTransformer(
+    return ColumnTransformer(
         transformers=[
             ("categorical", categorical_transformer, categorical_cols),
             ("numeric", numeric_transformer, numeric_cols),
         ]
     )
 
-    if problem_type == "classification":
-        model = RandomForestClassifier(
-            n_estimators=config.n_estimators,
-            random_state=config.random_state,
-            n_jobs=config.n_jobs,
+
+def build_estimator(
+    problem_type: ProblemType,
+    *,
+    config: Optional[FusionConfig] = None,
+) -> Any:
+    if config is None:
+        config = FusionConfig()
+    if config.model_family == "lgbm":
+        try:
+            import lightgbm
+        except ImportError:
+            pass
+        else:
+            lgbm_cls = (
+                lightgbm.LGBMClassifier
+                if problem_type == "classification"
+                else lightgbm.LGBMRegressor
+            )
+            return lgbm_cls(
+                n_estimators=config.n_estimators,
+                random_state=config.random_state,
+                n_jobs=config.n_jobs,
+                verbose=-1,
+            )
+    if config.model_family in ("hgbt", "lgbm"):
+        from sklearn.ensemble import (
+            HistGradientBoostingClassifier,
+            HistGradientBoostingRegressor,
         )
-    else:
-        model = RandomForestRegressor(
-            n_estimators=config.n_estimators,
+
+        # Boosting needs far fewer iterations than a forest needs trees
+        hgbt_cls = (
+            HistGradientBoostingClassifier
+            if problem_type == "classification"
+            else HistGradientBoostingRegressor
+        )
+        return hgbt_cls(
+            max_iter=max(1, config.n_estimators // 3),
+            early_stopping="auto",
             random_state=config.random_state,
-            n_jobs=config.n_jobs,
         )
+    if config.model_family != "rf":
+        raise ConfigurationError(f"Unknown model_family: {config.model_family!r}")
+    classifier_cls, regressor_cls = _get_rf_classes(config.use_sklearnex)
+    forest_cls = classifier_cls if problem_type == "classification" else regressor_cls
+    return forest_cls(
+        n_estimators=config.n_estimators,
+        max_depth=config.max_depth,
+        min_samples_leaf=config.min_samples_leaf,
+        random_state=config.random_state,
+        n_jobs=config.n_jobs,
+    )
+
+
+def build_sklearn_pipeline(
+    X: pd.DataFrame,
+    problem_type: ProblemType,
+    *,
+    config: Optional[FusionConfig] = None,
+) -> Pipeline:
+    from sklearn.pipeline import Pipeline
 
     pipeline: Pipeline = Pipeline(
         steps=[
-            ("preprocess", preprocessor),
-            ("model", model),
+            ("preprocess", build_preprocessor(X, config=config)),
+            ("model", build_estimator(problem_type, config=config)),
         ]
     )
     return pipeline
 
 
+@dataclass
+class EncodedFeatures:
+    """Feature matrices produced once by a fitted preprocessor.
+
+    Preprocessing does not depend on the target, so all targets trained on the
+    same features can share it instead of re-fitting and re-transforming it.
+    """
+
+    preprocessor: ColumnTransformer
+    train: Any
+    apply: Any
+
+
+def encode_features(
+    X: pd.DataFrame,
+    X_apply: pd.DataFrame,
+    *,
+    config: Optional[FusionConfig] = None,
+) -> EncodedFeatures:
+    """Fit the preprocessor on ``X`` and transform both ``X`` and ``X_apply``."""
+    preprocessor = build_preprocessor(X, config=config)
+    train = preprocessor.fit_transform(X)
+    return EncodedFeatures(
+        preprocessor=preprocessor,
+        train=train,
+        apply=preprocessor.transform(X_apply[list(X.columns)]),
+    )
+
+
 @dataclass
 class TrainedModel:
     problem_type: ProblemType
@@ -125,11 +290,23 @@ class TrainedModel:
     target: str
     features: Tuple[str, ...]
     extra: Optional[Dict[str, Any]] = None
+    # List form of ``features`` for DataFrame selection (a tuple would be a
+    # single key), built once instead of on every predict call
+    _feature_list: List[str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._feature_list = list(self.features)
 
 
 class ModelTrainer(Protocol):
     def train(
-        self, X: pd.DataFrame, y: pd.Series, problem_type: Optional[ProblemType], *, config: Optional[FusionConfig]
+        self,
+        X: pd.DataFrame,
+        y: pd.Series,
+        problem_type: Optional[ProblemType],
+        *,
+        config: Optional[FusionConfig],
+        encoded: Optional[EncodedFeatures] = None,
     ) -> "TrainedModel":
         ...
 
@@ -137,23 +314,179 @@ class ModelTrainer(Protocol):
         ...
 
 
+@lru_cache(maxsize=None)
+def _warn_missing_extra(flag: str, extra: str) -> None:
+    # Cached so a missing extra is reported once, not for every trained target
+    logger.warning(
+        "%s=True but the '%s' extra is not installed; predicting with scikit-learn", flag, extra
+    )
+
+
+def _export_onnx(estimator: Any) -> Optional[bytes]:
+    """Serialize a fitted estimator to ONNX, or return None if that is not possible.
+
+    Only the estimator is converted: it sees the dense numeric matrix produced
+    by the pipeline's preprocessor, which maps onto a single float input.
+    """
+    try:
+        from skl2onnx import convert_sklearn
+        from skl2onnx.common.data_types import FloatTensorType
+    except ImportError:
+        _warn_missing_extra("use_onnx", "onnx")
+        return None
+    try:
+        onnx_model = convert_sklearn(
+            estimator,
+            initial_types=[("X", FloatTensorType([None, estimator.n_features_in_]))],
+            options={id(estimator): {"zipmap": False}} if hasattr(estimator, "classes_") else None,
+        )
+        return cast(bytes, onnx_model.SerializeToString())
+    except Exception:
+        logger.warning(
+            "ONNX export of %s failed; predicting with scikit-learn",
+            type(estimator).__name__,
+            exc_info=True,
+        )
+        return None
+
+
+def _onnx_session(model: TrainedModel) -> Any:
+    """Return the ONNX Runtime session for ``model``, creating it on first use.
+
+    The session is created lazily from the serialized model so that a
+    :class:`TrainedModel` stays picklable, e.g. when returned by joblib workers.
+    """
+    extra = model.extra
+    if extra is None or extra.get("onnx_model") is None:
+        return None
+    session = extra.get("onnx_session")
+    if session is None:
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            _warn_missing_extra("use_onnx", "onnx")
+            return None
+        session = ort.InferenceSession(extra["onnx_model"], providers=["CPUExecutionProvider"])
+        extra["onnx_session"] = session
+    return session
+
+
+def _dense_float32(X_encoded: Any) -> npt.NDArray[np.float32]:
+    if hasattr(X_encoded, "toarray"):
+        X_encoded = X_encoded.toarray()
+    # Trees compare on float32 thresholds, so the cast does not change results
+    return np.asarray(X_encoded, dtype=np.float32)
+
+
+def _predict_onnx(session: Any, X_encoded: Any) -> npt.NDArray[Any]:
+    X_dense = _dense_float32(X_encoded)
+    out = np.asarray(session.run(None, {session.get_inputs()[0].name: X_dense})[0]).ravel()
+    # ONNX regressors emit float32; keep the float64 sklearn would return
+    return out.astype(np.float64) if out.dtype == np.float32 else out
+
+
+def _export_treelite(estimator: Any) -> Optional[bytes]:
+    """Serialize a fitted tree ensemble to Treelite, or return None if not possible."""
+    try:
+        import treelite
+    except ImportError:
+        _warn_missing_extra("use_treelite", "treelite")
+        return None
+    try:
+        return bytes(treelite.sklearn.import_model(estimator).serialize_bytes())
+    except Exception:
+        logger.warning(
+            "Treelite export of %s failed; predicting with scikit-learn",
+            type(estimator).__name__,
+            exc_info=True,
+        )
+        return None
+
+
+def _treelite_model(model: TrainedModel) -> Any:
+    """Return the Treelite model for ``model``, deserializing it on first use.
+
+    Like the ONNX session, the loaded model holds native pointers and cannot be
+    pickled, so only its serialized bytes are kept on the trained model.
+    """
+    extra = model.extra
+    if extra is None or extra.get("treelite_model") is None:
+        return None
+    tl_model = extra.get("treelite_handle")
+    if tl_model is None:
+        try:
+            import treelite
+        except ImportError:
+            _warn_missing_extra("use_treelite", "treelite")
+            return None
+        tl_model = treelite.Model.deserialize_bytes(extra["treelite_model"])
+        extra["treelite_handle"] = tl_model
+    return tl_model
+
+
+def _predict_treelite(tl_model: Any, estimator: Any, X_encoded: Any) -> npt.NDArray[Any]:
+    import treelite
+
+    X_dense = _dense_float32(X_encoded)
+    out = np.asarray(treelite.gtil.predict(tl_model, X_dense)).reshape(X_dense.shape[0], -1)
+    classes = getattr(estimator, "classes_", None)
+    if classes is not None:
+        # GTIL returns averaged class probabilities; pick labels like sklearn does
+        return cast(npt.NDArray[Any], classes[out.argmax(axis=1)])
+    return out[:, 0].astype(np.float64)
+
+
+def _compiled_predictor(model: TrainedModel) -> Optional[Callable[[Any], npt.NDArray[Any]]]:
+    """Return a predict function over encoded features from an exported model, if any."""
+    session = _onnx_session(model)
+    if session is not None:
+        return partial(_predict_onnx, session)
+    tl_model = _treelite_model(model)
+    if tl_model is not None:
+        return partial(_predict_treelite, tl_model, model.model.named_steps["model"])
+    return None
+
+
 class SklearnTrainer:
     def train(
-        self, X: pd.DataFrame, y: pd.Series, problem_type: Optional[ProblemType] = None, *, config: Optional[FusionConfig] = None
+        self,
+        X: pd.DataFrame,
+        y: pd.Series,
+        problem_type: Optional[ProblemType] = None,
+        *,
+        config: Optional[FusionConfig] = None,
+        encoded: Optional[EncodedFeatures] = None,
     ) -> "TrainedModel":
         if config is None:
             config = FusionConfig()
         if problem_type is None:
             problem_type = detect_problem_type(y)
         features = tuple(X.columns.tolist())
-        pipeline = build_sklearn_pipeline(X, problem_type, config=config)
-        pipeline.fit(X, y)
+        if encoded is not None:
+            from sklearn.pipeline import Pipeline
+
+            # Only the estimator is fitted; the shared preprocessor is already fitted
+            estimator = build_estimator(problem_type, config=config)
+            estimator.fit(encoded.train, y)
+            pipeline = Pipeline(
+                steps=[("preprocess", encoded.preprocessor), ("model", estimator)]
+            )
+        else:
+            pipeline = build_sklearn_pipeline(X, problem_type, config=config)
+            pipeline.fit(X, y)
+        exported: Dict[str, Any] = {}
+        if config.use_onnx:
+            exported["onnx_model"] = _export_onnx(pipeline.named_steps["model"])
+        if config.use_treelite:
+            exported["treelite_model"] = _export_treelite(pipeline.named_steps["model"])
+        extra = {k: v for k, v in exported.items() if v is not None}
         return TrainedModel(
             problem_type=problem_type,
             model=pipeline,
             backend="sklearn",
             target=y.name,
             features=features,
+            extra=extra or None,
         )
 
     def infer_problem_type(self, y: pd.Series) -> ProblemType:
@@ -162,8 +495,15 @@ class SklearnTrainer:
 
 class PyCaretTrainer:
     def train(
-        self, X: pd.DataFrame, y: pd.Series, problem_type: Optional[ProblemType] = None, *, config: Optional[FusionConfig] = None
+        self,
+        X: pd.DataFrame,
+        y: pd.Series,
+        problem_type: Optional[ProblemType] = None,
+        *,
+        config: Optional[FusionConfig] = None,
+        encoded: Optional[EncodedFeatures] = None,
     ) -> "TrainedModel":
+        # PyCaret runs its own preprocessing, so ``encoded`` is not used here
         if config is None:
             config = FusionConfig()
         if problem_type is None:
@@ -181,8 +521,10 @@ class PyCaretTrainer:
             exp = RegressionExperiment()
             sort_metric = "R2"
         
-        data = X.copy()
-        data[y.name] = y
+        # Reference X's columns instead of deep-copying the feature matrix
+        columns: Dict[Any, pd.Series] = {c: X[c] for c in X.columns}
+        columns[y.name] = y
+        data = pd.DataFrame(columns, copy=False)
         exp.setup(
             data=data,
             target=y.name,
@@ -207,11 +549,16 @@ class PyCaretTrainer:
         return detect_problem_type(y)
 
 
+# Trainers are stateless, so one shared instance of each serves every call
+_SKLEARN_TRAINER = SklearnTrainer()
+_PYCARET_TRAINER = PyCaretTrainer()
+
+
 def get_trainer(config: Optional[FusionConfig]) -> ModelTrainer:
     cfg = config or FusionConfig()
     if cfg.prefer_pycaret and is_pycaret_available():
-        return PyCaretTrainer()
-    return SklearnTrainer()
+        return _PYCARET_TRAINER
+    return _SKLEARN_TRAINER
 
 
 def train_model(
@@ -221,30 +568,70 @@ def train_model(
     *,
     config: Optional[FusionConfig] = None,
 ) -> TrainedModel:
-    trainer = get_trainer(config)
-    return trainer.train(X, y, problem_type, config=config)
+    cfg = config or FusionConfig()
+    if cfg.prefer_pycaret and is_pycaret_available():
+        return _PYCARET_TRAINER.train(X, y, problem_type, config=cfg)
+    return _SKLEARN_TRAINER.train(X, y, problem_type, config=cfg)
 
 
-def predict(model: TrainedModel, X: pd.DataFrame) -> npt.NDArray[Any]:
+def predict(
+    model: TrainedModel,
+    X: pd.DataFrame,
+    *,
+    encoded: Optional[EncodedFeatures] = None,
+) -> npt.NDArray[Any]:
     """Predict using a trained model.
+
+    ``encoded`` may carry ``X`` already transformed by the model's own
+    preprocessor (see :func:`encode_features`), which skips re-encoding it.
+    sklearn models exported with ``FusionConfig.use_onnx`` or ``use_treelite``
+    run through ONNX Runtime or Treelite when the package is installed.
     
     Raises:
         ValueError: If PyCaret model is missing required experiment data.
     """
-    # Ensure proper list-based column selection (tuple would be a single key)
-    X = X[list(model.features)]
     if model.backend == "pycaret":
         if model.extra is None:
             raise ValueError("PyCaret model missing 'extra' dictionary")
         if "experiment" not in model.extra:
             raise ValueError("PyCaret model missing 'experiment' in extra dictionary")
         exp = model.extra["experiment"]
-        preds = exp.predict_model(model.model, data=X)
+        preds = exp.predict_model(model.model, data=X[model._feature_list])
         # Prediction column name in PyCaret output is 'prediction_label'
         return preds["prediction_label"].to_numpy()
     # sklearn
-    predictor = cast(PredictorProtocol, model.model)
-    return predictor.predict(X)
+    steps = getattr(model.model, "named_steps", None)
+    if steps is None:
+        predictor = cast(PredictorProtocol, model.model)
+        return predictor.predict(X[model._feature_list])
+    if encoded is not None and steps["preprocess"] is encoded.preprocessor:
+        X_encoded = encoded.apply
+    else:
+        X_encoded = steps["preprocess"].transform(X[model._feature_list])
+    compiled = _compiled_predictor(model)
+    if compiled is not None:
+        return compiled(X_encoded)
+    return cast(npt.NDArray[Any], steps["model"].predict(X_encoded))
+
+
+Folds = List[Tuple[npt.NDArray[np.intp], npt.NDArray[np.intp]]]
+
+
+def kfold_indices(n_samples: int, *, config: Optional[FusionConfig] = None) -> Folds:
+    """Precompute shuffled KFold (train, test) indices for ``n_samples`` rows.
+
+    KFold does not look at the target, so regression targets sharing the same
+    feature matrix can reuse one set of folds instead of re-splitting per target.
+    """
+    from sklearn.model_selection import KFold
+
+    if config is None:
+        config = FusionConfig()
+    splits = min(config.cv_splits, max(2, n_samples))
+    if n_samples < splits:
+        return []
+    cv = KFold(n_splits=splits, shuffle=True, random_state=config.random_state)
+    return list(cv.split(np.arange(n_samples)))
 
 
 def cross_validate_metrics(
@@ -253,10 +640,26 @@ def cross_validate_metrics(
     problem_type: ProblemType,
     *,
     config: Optional[FusionConfig] = None,
+    encoded: Optional[EncodedFeatures] = None,
+    folds: Optional[Folds] = None,
 ) -> Dict[str, float]:
+    """Cross-validate the sklearn model for one target.
+
+    ``folds`` may carry indices from :func:`kfold_indices`; they are used for
+    regression targets whenever they match the number of splits required.
+    ``encoded`` may carry the features already transformed by a preprocessor
+    fitted on ``X``; otherwise one is fitted here, once for all folds.
+
+    Because that preprocessor is fitted on the full sample, the imputation
+    statistics and one-hot categories of each held-out fold are also seen
+    when training on the other folds. This affects only the unsupervised
+    feature encoding, never the target, but the reported scores can be
+    slightly optimistic compared with refitting the preprocessor per fold.
+    """
+    from sklearn.model_selection import KFold, StratifiedKFold, cross_validate
+
     if config is None:
         config = FusionConfig()
-    pipeline = build_sklearn_pipeline(X, problem_type, config=config)
     if problem_type == "classification":
         y_non_null = y.dropna()
         # Ensure sufficient members per class for StratifiedKFold
@@ -278,15 +681,38 @@ def cross_validate_metrics(
         splits = min(config.cv_splits, max(2, n_obs))
         if splits < 2:
             return {}
-        cv = KFold(n_splits=splits, shuffle=True, random_state=config.random_state)
+        cv = (
+            folds
+            if folds and len(folds) == splits
+            else KFold(n_splits=splits, shuffle=True, random_state=config.random_state)
+        )
         scoring = {
             "r2": "r2",
             "neg_rmse": "neg_root_mean_squared_error",
             "mae": "neg_mean_absolute_error",
         }
-    out = cross_validate(
-        pipeline, X, y, cv=cv, scoring=scoring, error_score=np.nan, n_jobs=config.n_jobs
-    )
+    # Preprocessing is fitted once on the full sample (or reused from
+    # ``encoded``) rather than per fold, see the docstring; only the estimator
+    # is refit on each split. Parallelism goes to the folds, so each fold's
+    # forest runs single-threaded.
+    pipeline = build_estimator(problem_type, config=replace(config, n_jobs=1))
+    if encoded is not None:
+        X_cv = encoded.train
+    else:
+        X_cv = build_preprocessor(X, config=config).fit_transform(X)
+    # Forest fitting releases the GIL, so threads avoid pickling X per fold.
+    # X_cv is already an encoded array; y goes in as one too, so folds slice
+    # plain arrays instead of re-indexing a Series.
+    with joblib.parallel_backend("threading", n_jobs=config.n_jobs):
+        out = cross_validate(
+            pipeline,
+            X_cv,
+            y.to_numpy(),
+            cv=cv,
+            scoring=scoring,
+            error_score=np.nan,
+            n_jobs=config.n_jobs,
+        )
     metrics: Dict[str, float] = {}
     for key, values in out.items():
         if key.startswith("test_"):
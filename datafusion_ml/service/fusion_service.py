@@ -1,13 +1,48 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import math
+from dataclasses import replace
+from typing import Any, Dict, List, Mapping, Optional, Union, cast
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 
 from ..config import FusionConfig
 from ..errors import OverlapError, TargetsError, ConfigurationError
-from ..fusion import fuse_datasets
-from ..web.schemas import FuseRequest, FuseResponse
+from ..fusion import FusionResult, fuse_datasets
+from ..web.schemas import FuseOptions, FuseRequest, FuseResponse
+
+
+# Request fields that map 1:1 onto FusionConfig attributes
+_ADVANCED_FIELDS = {
+    "model_family",
+    "cv_splits",
+    "n_estimators",
+    "max_depth",
+    "min_samples_leaf",
+    "use_sparse_onehot",
+    "categorical_encoding",
+    "use_sklearnex",
+    "max_category_cardinality",
+    "warn_on_high_cardinality",
+}
+
+
+def _records_to_frame(records: Union[List[Dict[str, Any]], Dict[str, List[Any]]]) -> pd.DataFrame:
+    """Build a DataFrame from JSON records via Arrow's columnar converter.
+
+    Columnar payloads (an object of column arrays) are already in the shape
+    pandas stores and go straight into the constructor. Records fall back to
+    pandas when Arrow cannot type them consistently, e.g. a column that mixes
+    numbers and strings.
+    """
+    if isinstance(records, dict):
+        return pd.DataFrame(records)
+    try:
+        return cast(pd.DataFrame, pa.Table.from_struct_array(pa.array(records)).to_pandas())
+    except (pa.ArrowException, TypeError, ValueError):
+        return pd.DataFrame.from_records(records)
 
 
 def _maybe_filter_dataframe(
@@ -16,74 +51,175 @@ def _maybe_filter_dataframe(
     columns_include: Optional[List[str]],
     columns_exclude: Optional[List[str]],
 ) -> pd.DataFrame:
-    out = df
+    # Cut rows first so the column selection only copies the rows we return
+    out = df.iloc[:row_limit] if row_limit is not None else df
+    if not columns_include and not columns_exclude:
+        return out
+    present = frozenset(out.columns)
     if columns_include:
-        cols = [c for c in columns_include if c in out.columns]
+        cols = [c for c in columns_include if c in present]
         if cols:
             out = out[cols]
+            present = frozenset(cols)
     if columns_exclude:
-        drop_cols = [c for c in columns_exclude if c in out.columns]
+        drop_cols = [c for c in columns_exclude if c in present]
         if drop_cols:
             out = out.drop(columns=drop_cols)
-    if row_limit is not None:
-        out = out.head(row_limit)
     return out
 
 
-def perform_fusion(req: FuseRequest) -> FuseResponse:
-    df_a = pd.DataFrame.from_records(req.df_a)
-    df_b = pd.DataFrame.from_records(req.df_b)
+def _frame_to_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convert ``df`` to JSON-ready records, like ``to_dict(orient="records")``.
+
+    Each column is converted to Python scalars in one ``tolist`` call and the
+    rows are zipped together, which skips pandas' per-cell boxing.
+    """
+    columns = df.columns.tolist()
+    return [dict(zip(columns, row)) for row in zip(*(df[c].tolist() for c in columns))]
+
+
+def _is_metric_value(value: Any) -> bool:
+    return isinstance(value, (int, float, np.floating)) and not math.isnan(value)
 
-    config = FusionConfig(
-        prefer_pycaret=req.prefer_pycaret if req.prefer_pycaret is not None else True,
-        random_state=req.random_state if req.random_state is not None else 42,
+
+def _clean_metrics(metrics: Mapping[str, Mapping[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Drop NaN metric values (e.g. undefined scores on degenerate folds).
+
+    Per-target mappings without NaN values are passed through as-is; only
+    those that need filtering are rebuilt.
+    """
+    # Values are float/np.floating already; orjson serializes NumPy scalars natively
+    return {
+        target: cast(Dict[str, Any], target_metrics)
+        if isinstance(target_metrics, dict)
+        and all(_is_metric_value(value) for value in target_metrics.values())
+        else {name: value for name, value in target_metrics.items() if _is_metric_value(value)}
+        for target, target_metrics in metrics.items()
+    }
+
+
+def _run_fusion(df_a: pd.DataFrame, df_b: pd.DataFrame, options: FuseOptions) -> FusionResult:
+    overrides = {
+        k: v for k, v in options.model_dump(include=_ADVANCED_FIELDS).items() if v is not None
+    }
+    config = replace(
+        FusionConfig(
+            prefer_pycaret=options.prefer_pycaret if options.prefer_pycaret is not None else True,
+            random_state=options.random_state if options.random_state is not None else 42,
+        ),
+        **overrides,
     )
-    # Apply advanced fields
-    if req.cv_splits is not None:
-        config.cv_splits = req.cv_splits
-    if req.n_estimators is not None:
-        config.n_estimators = req.n_estimators
-    if req.use_sparse_onehot is not None:
-        config.use_sparse_onehot = req.use_sparse_onehot
-    if req.max_category_cardinality is not None:
-        config.max_category_cardinality = req.max_category_cardinality
-    if req.warn_on_high_cardinality is not None:
-        config.warn_on_high_cardinality = req.warn_on_high_cardinality
 
     result = fuse_datasets(
         df_a=df_a,
         df_b=df_b,
-        overlap_features=req.overlap_features,
-        targets_from_a=req.targets_from_a,
-        targets_from_b=req.targets_from_b,
-        prefer_pycaret=req.prefer_pycaret if req.prefer_pycaret is not None else True,
-        random_state=req.random_state if req.random_state is not None else 42,
+        overlap_features=options.overlap_features,
+        targets_from_a=options.targets_from_a,
+        targets_from_b=options.targets_from_b,
+        prefer_pycaret=options.prefer_pycaret if options.prefer_pycaret is not None else True,
+        random_state=options.random_state if options.random_state is not None else 42,
         config=config,
     )
+    return result
+
+
+def _wanted_parts(options: FuseOptions) -> set[str]:
+    return set(options.return_parts or ["fused", "a_enriched", "b_enriched", "metrics"])
+
+
+def perform_fusion_df(df_a: pd.DataFrame, df_b: pd.DataFrame, options: FuseOptions) -> FuseResponse:
+    """Fuse two DataFrames and shape the response like ``perform_fusion``.
 
-    wanted = set(req.return_parts or ["fused", "a_enriched", "b_enriched", "metrics"])
+    For callers that already hold DataFrames (e.g. file uploads), so the
+    datasets never round-trip through JSON records.
+    """
+    result = _run_fusion(df_a, df_b, options)
+    wanted = _wanted_parts(options)
 
     response = FuseResponse()
     if "fused" in wanted:
-        response.fused = _maybe_filter_dataframe(
-            result.fused, req.row_limit, req.columns_include, req.columns_exclude
-        ).to_dict(orient="records")
+        response.fused = _frame_to_records(
+            _maybe_filter_dataframe(
+                result.fused, options.row_limit, options.columns_include, options.columns_exclude
+            )
+        )
     if "a_enriched" in wanted:
-        response.a_enriched = _maybe_filter_dataframe(
-            result.a_enriched, req.row_limit, req.columns_include, req.columns_exclude
-        ).to_dict(orient="records")
+        response.a_enriched = _frame_to_records(
+            _maybe_filter_dataframe(
+                result.a_enriched, options.row_limit, options.columns_include, options.columns_exclude
+            )
+        )
     if "b_enriched" in wanted:
-        response.b_enriched = _maybe_filter_dataframe(
-            result.b_enriched, req.row_limit, req.columns_include, req.columns_exclude
-        ).to_dict(orient="records")
+        response.b_enriched = _frame_to_records(
+            _maybe_filter_dataframe(
+                result.b_enriched, options.row_limit, options.columns_include, options.columns_exclude
+            )
+        )
     if "metrics" in wanted:
-        def _clean(d: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
-            out: Dict[str, Dict[str, float]] = {}
-            for k, sub in d.items():
-                out[k] = {mk: float(mv) for mk, mv in sub.items() if mv == mv}
-            return out
-
-        response.metrics_a_to_b = _clean({k: dict(v) for k, v in result.metrics_a_to_b.items()})
-        response.metrics_b_to_a = _clean({k: dict(v) for k, v in result.metrics_b_to_a.items()})
+        response.metrics_a_to_b = _clean_metrics(result.metrics_a_to_b)
+        response.metrics_b_to_a = _clean_metrics(result.metrics_b_to_a)
     return response
 
+
+def perform_fusion(req: FuseRequest) -> FuseResponse:
+    return perform_fusion_df(_records_to_frame(req.df_a), _records_to_frame(req.df_b), req)
+
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def _metrics_frame(result: FusionResult) -> pd.DataFrame:
+    rows = [
+        (direction, target, name, float(value))
+        for direction, metrics in (
+            ("a_to_b", _clean_metrics(result.metrics_a_to_b)),
+            ("b_to_a", _clean_metrics(result.metrics_b_to_a)),
+        )
+        for target, target_metrics in metrics.items()
+        for name, value in target_metrics.items()
+    ]
+    return pd.DataFrame(rows, columns=["direction", "target", "metric", "value"])
+
+
+def _to_ipc_stream(part: str, df: pd.DataFrame) -> pa.Buffer:
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata(
+        {**(table.schema.metadata or {}), b"datafusion.part": part.encode()}
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def perform_fusion_arrow_df(
+    df_a: pd.DataFrame, df_b: pd.DataFrame, options: FuseOptions
+) -> List[pa.Buffer]:
+    """Run fusion and encode each requested part as an Arrow IPC stream.
+
+    Every part (``fused``, ``a_enriched``, ``b_enriched``, ``metrics``) is a
+    self-contained stream whose schema metadata carries the part name under
+    ``datafusion.part``; the streams are meant to be sent back to back.
+    Metrics are a long table with ``direction, target, metric, value`` columns.
+    """
+    result = _run_fusion(df_a, df_b, options)
+    wanted = _wanted_parts(options)
+
+    buffers: List[pa.Buffer] = []
+    for part, df in (
+        ("fused", result.fused),
+        ("a_enriched", result.a_enriched),
+        ("b_enriched", result.b_enriched),
+    ):
+        if part in wanted:
+            filtered = _maybe_filter_dataframe(
+                df, options.row_limit, options.columns_include, options.columns_exclude
+            )
+            buffers.append(_to_ipc_stream(part, filtered))
+    if "metrics" in wanted:
+        buffers.append(_to_ipc_stream("metrics", _metrics_frame(result)))
+    return buffers
+
+
+def perform_fusion_arrow(req: FuseRequest) -> List[pa.Buffer]:
+    return perform_fusion_arrow_df(_records_to_frame(req.df_a), _records_to_frame(req.df_b), req)
@@ -1,25 +1,47 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Dict, Callable, Awaitable
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Tuple
 
-from fastapi import FastAPI
+from fastapi import APIRouter, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.routing import APIRoute
 from pythonjsonlogger import jsonlogger
 from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
-from starlette.requests import Request
 from starlette.responses import Response
 
-from .config import APISettings
+from ..modeling import warm_pycaret
+from .config import APISettings, get_settings
 from .errors import register_exception_handlers
-from .middleware import RateLimiter, jwt_auth_middleware, rate_limit_middleware
-from .routers.fusion import router as fusion_router
+from .middleware import (
+    BodySizeLimitMiddleware,
+    JWTAuthMiddleware,
+    RateLimiter,
+    RateLimitMiddleware,
+    RequestMetricsMiddleware,
+)
+from .responses import ORJSONResponse
+from .routers.fusion import cleanup_jobs_periodically, router as fusion_router
 
 
 logger = logging.getLogger(__name__)
 
 
+# (level, format) the root logger was last configured with by _setup_logging
+_LOGGING_CONFIG: Optional[Tuple[str, str]] = None
+
+
 def _setup_logging(settings: APISettings) -> None:
+    global _LOGGING_CONFIG
+    config = (settings.log_level.upper(), settings.log_format)
+    if config == _LOGGING_CONFIG:
+        # Already configured for this level/format, e.g. another create_app()
+        return
+    _LOGGING_CONFIG = config
     root = logging.getLogger()
     for h in list(root.handlers):
         root.removeHandler(h)
@@ -36,16 +58,43 @@ def _setup_logging(settings: APISettings) -> None:
 
 
 def create_app() -> FastAPI:
-    settings = APISettings.from_env()
+    settings = get_settings()
     _setup_logging(settings)
 
-    app = FastAPI(title="datafusion-ml API", version="0.1.0")
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        if settings.warm_pycaret:
+            warm_pycaret()
+        # Fusion is CPU-bound and holds the GIL, so run it in separate processes
+        # when configured; otherwise routes fall back to the threadpool.
+        pool = (
+            ProcessPoolExecutor(max_workers=settings.fusion_workers)
+            if settings.fusion_workers > 0
+            else None
+        )
+        app.state.fusion_pool = pool
+        # Expired async jobs are swept in the background, not on each request
+        cleanup = asyncio.create_task(cleanup_jobs_periodically())
+        try:
+            yield
+        finally:
+            cleanup.cancel()
+            app.state.fusion_pool = None
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    app = FastAPI(
+        title="datafusion-ml API",
+        version="0.1.0",
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse,
+    )
 
     if settings.cors_enabled:
         # If no origins specified, default to allowing all (for backward compatibility)
         # but log a warning for production awareness
-        cors_origins = settings.cors_origins if settings.cors_origins else ["*"]
-        if cors_origins == ["*"]:
+        cors_origins = settings.cors_origins or ("*",)
+        if cors_origins == ("*",):
             logger.warning(
                 "CORS is configured to allow all origins (*). "
                 "This is not recommended for production. "
@@ -63,82 +112,70 @@ def create_app() -> FastAPI:
 
     # Rate limiting middleware (if enabled)
     if settings.rate_limit_enabled:
-        rate_limiter = RateLimiter(requests_per_minute=settings.rate_limit_per_minute)
-        
-        @app.middleware("http")
-        async def rate_limit(
-            request: Request, call_next: Callable[[Request], Awaitable[Response]]
-        ) -> Response:
-            return await rate_limit_middleware(request, call_next, rate_limiter)
-        
+        app.add_middleware(
+            RateLimitMiddleware,
+            rate_limiter=RateLimiter(
+                requests_per_minute=settings.rate_limit_per_minute,
+                max_clients=settings.rate_limit_max_clients,
+            ),
+        )
         logger.info(
             f"Rate limiting enabled: {settings.rate_limit_per_minute} requests per minute"
         )
 
     # JWT authentication middleware (if enabled)
     if settings.jwt_enabled:
-        @app.middleware("http")
-        async def jwt_auth(
-            request: Request, call_next: Callable[[Request], Awaitable[Response]]
-        ) -> Response:
-            return await jwt_auth_middleware(
-                request,
-                call_next,
-                settings.jwt_secret,
-                settings.jwt_algorithm,
-            )
-        
+        app.add_middleware(
+            JWTAuthMiddleware,
+            jwt_secret=settings.jwt_secret,
+            jwt_algorithm=settings.jwt_algorithm,
+            cache_enabled=settings.jwt_cache_enabled,
+        )
         logger.info("JWT authentication enabled")
 
     # Metrics endpoint (Prometheus)
     if settings.enable_metrics:
-        @app.get("/metrics")
-        def metrics() -> Response:  # type: ignore[no-untyped-def]
-            output = generate_latest()  # from default REGISTRY
-            return Response(content=output, media_type=CONTENT_TYPE_LATEST)
+        # Rendered output is reused for metrics_cache_ttl_s so that several
+        # scrapers share one render. The handler is async (rendering the
+        # small registry takes well under a millisecond), so renders are
+        # already serialised on the event loop and need no lock.
+        metrics_cache: Optional[Tuple[float, bytes]] = None
 
-    # Health endpoint
+        @app.get("/metrics")
+        async def metrics() -> Response:  # type: ignore[no-untyped-def]
+            nonlocal metrics_cache
+            now = time.monotonic()
+            if metrics_cache is None or now - metrics_cache[0] >= settings.metrics_cache_ttl_s:
+                metrics_cache = (now, generate_latest())  # from default REGISTRY
+            return Response(content=metrics_cache[1], media_type=CONTENT_TYPE_LATEST)
+
+    # Health endpoint, async to skip the threadpool hop
     @app.get("/v1/health")
-    def health() -> Dict[str, str]:
+    async def health() -> Dict[str, str]:
         return {"status": "ok"}
 
     # Routers
     app.include_router(fusion_router, prefix="/v1")
 
     if settings.enable_unversioned_routes:
-        # Backwards-compatible unversioned routes
-        app.get("/health")(health)
-        for r in list(fusion_router.routes):
-            if hasattr(r, "path") and hasattr(r, "methods"):
-                # We only recreate /fuse for backward compat
-                # Avoid duplicating multiple routes if added later
-                if getattr(r, "path", "").endswith("/fuse"):
-                    app.add_api_route("/fuse", r.endpoint, methods=list(r.methods))  # type: ignore[arg-type]
-
-    # Body size limit via middleware
-    max_bytes = settings.max_body_mb * 1024 * 1024
-
-    @app.middleware("http")
-    async def limit_body_size(
-        request: Request, call_next: Callable[[Request], Awaitable[Response]]
-    ) -> Response:
-        # Skip body size check for multipart/form-data (file uploads handled separately)
-        content_type = request.headers.get("content-type", "")
-        if "multipart/form-data" in content_type:
-            return await call_next(request)
-        
-        # Read body to check size, then recreate request with body for downstream handlers
-        body = await request.body()
-        if len(body) > max_bytes:
-            return Response(status_code=413, content="Request entity too large")
-        
-        # Recreate request with body so downstream handlers can read it
-        # This is necessary because request.body() consumes the stream
-        async def receive() -> dict:
-            return {"type": "http.request", "body": body, "more_body": False}
-        
-        request._receive = receive  # type: ignore[attr-defined]
-        return await call_next(request)
+        # Backwards-compatible unversioned aliases; only /health and /fuse
+        # are re-exported, registered in one pass through a small router
+        unversioned = APIRouter()
+        unversioned.add_api_route("/health", health, methods=["GET"])
+        fuse = next(
+            (r for r in fusion_router.routes if isinstance(r, APIRoute) and r.path == "/fuse"),
+            None,
+        )
+        if fuse is not None:
+            unversioned.add_api_route("/fuse", fuse.endpoint, methods=list(fuse.methods or ()))
+        app.include_router(unversioned)
+
+    # Body size limit, registered after auth and rate limiting so it runs first
+    app.add_middleware(BodySizeLimitMiddleware, max_bytes=settings.max_body_bytes)
+
+    # Request metrics, outermost so rejected requests are counted too
+    if settings.enable_metrics:
+        app.add_middleware(RequestMetricsMiddleware)
 
     return app
 
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from typing import List
+from functools import lru_cache
+from typing import Any, Tuple
 
-from pydantic import Field
+from pydantic import Field, field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -13,8 +14,8 @@ class APISettings(BaseSettings):
         default=True,
         description="Enable CORS middleware. Set to False to disable CORS entirely."
     )
-    cors_origins: List[str] = Field(
-        default_factory=lambda: [],
+    cors_origins: Tuple[str, ...] = Field(
+        default=(),
         description="List of allowed CORS origins. Empty list means no CORS. "
                    "Use ['*'] for development only (not recommended for production)."
     )
@@ -22,21 +23,44 @@ class APISettings(BaseSettings):
         default=False,
         description="Allow credentials in CORS requests. Cannot be True if origins contains '*'."
     )
-    cors_allow_methods: List[str] = Field(
-        default_factory=lambda: ["GET", "POST", "OPTIONS"],
+    cors_allow_methods: Tuple[str, ...] = Field(
+        default=("GET", "POST", "OPTIONS"),
         description="List of allowed HTTP methods for CORS. Default: GET, POST, OPTIONS."
     )
-    cors_allow_headers: List[str] = Field(
-        default_factory=lambda: ["Content-Type", "Accept"],
+    cors_allow_headers: Tuple[str, ...] = Field(
+        default=("Content-Type", "Accept"),
         description="List of allowed headers for CORS. Default: Content-Type, Accept."
     )
 
     enable_metrics: bool = Field(default=True)
+    metrics_cache_ttl_s: float = Field(
+        default=5.0,
+        ge=0,
+        description="Seconds a rendered /metrics response is reused. 0 renders on every scrape."
+    )
     enable_unversioned_routes: bool = Field(default=True)
 
     max_body_mb: int = Field(default=50, ge=1)
     max_rows: int = Field(default=200_000, ge=1)
 
+    workers: int = Field(
+        default=1,
+        ge=1,
+        description="Number of uvicorn worker processes started by datafusion-ml-api. "
+                   "Async jobs live in process memory, so enable job persistence when using >1."
+    )
+    fusion_workers: int = Field(
+        default=0,
+        ge=0,
+        description="Number of worker processes for CPU-bound fusion requests. "
+                   "0 disables the process pool and runs fusion in the threadpool."
+    )
+
+    warm_pycaret: bool = Field(
+        default=False,
+        description="Import PyCaret at startup instead of on the first fusion request."
+    )
+
     log_level: str = Field(default="INFO")
     log_format: str = Field(default="json")  # json|plain
 
@@ -50,6 +74,12 @@ class APISettings(BaseSettings):
         ge=1,
         description="Maximum number of requests per minute per client."
     )
+    rate_limit_max_clients: int = Field(
+        default=100_000,
+        ge=1,
+        description="Maximum number of clients tracked by the rate limiter. "
+                   "The least recently seen client is evicted beyond this."
+    )
 
     # JWT Authentication
     jwt_enabled: bool = Field(
@@ -64,6 +94,10 @@ class APISettings(BaseSettings):
         default="HS256",
         description="JWT algorithm for token validation."
     )
+    jwt_cache_enabled: bool = Field(
+        default=True,
+        description="Remember verified tokens until their exp claim to skip repeated signature checks."
+    )
 
     # Job persistence
     job_persistence_enabled: bool = Field(
@@ -75,31 +109,46 @@ class APISettings(BaseSettings):
         description="Directory path for storing job data. Created if it doesn't exist."
     )
 
+    @property
+    def max_body_bytes(self) -> int:
+        return self.max_body_mb * 1024 * 1024
+
+    @field_validator("cors_origins", mode="before")
     @classmethod
-    def from_env(cls) -> "APISettings":
-        """Create settings from environment variables.
-        
-        Handles comma-separated string values for CORS settings from environment.
-        Pydantic will parse these automatically, but this method provides
-        additional normalization for edge cases.
-        """
-        settings = cls()
-        # Normalize CORS origins if provided as comma-separated string via env
-        # This can happen if env var is set as a string instead of JSON array
-        if isinstance(settings.cors_origins, str):
-            origins_list = [o.strip() for o in settings.cors_origins.split(",") if o.strip()]
-            settings.cors_origins = origins_list
-        # Validate CORS configuration
-        if settings.cors_allow_credentials and "*" in settings.cors_origins:
+    def _split_cors_origins(cls, value: Any) -> Any:
+        # Accept a comma-separated string as well as a sequence of origins
+        if isinstance(value, str):
+            return tuple(o.strip() for o in value.split(",") if o.strip())
+        return value
+
+    @model_validator(mode="after")
+    def _validate(self) -> "APISettings":
+        """Reject inconsistent CORS and JWT configuration at construction."""
+        if self.cors_allow_credentials and "*" in self.cors_origins:
             raise ValueError(
                 "CORS allow_credentials cannot be True when origins contains '*'. "
                 "Specify explicit origins for credential support."
             )
-        # Validate JWT configuration
-        if settings.jwt_enabled and not settings.jwt_secret:
+        if self.jwt_enabled and not self.jwt_secret:
             raise ValueError(
                 "JWT authentication is enabled but jwt_secret is not set. "
                 "Set DFML_JWT_SECRET environment variable."
             )
-        return settings
+        if self.jwt_enabled:
+            from .middleware import _HAS_JWT
+
+            if not _HAS_JWT:
+                raise ValueError(
+                    "JWT authentication is enabled but PyJWT is not installed. "
+                    "Install with: pip install 'datafusion-ml[auth]' or pip install PyJWT"
+                )
+        return self
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> APISettings:
+    """Return the process-wide settings, read from the environment once.
 
+    Call ``get_settings.cache_clear()`` after changing ``DFML_*`` variables.
+    """
+    return APISettings()
@@ -1,25 +1,31 @@
 from __future__ import annotations
 
+from typing import Dict, Type
+
 from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from starlette.requests import Request
 
-from ..errors import OverlapError, TargetsError, ConfigurationError
+from ..errors import DataFusionError, OverlapError, TargetsError, ConfigurationError
+from .responses import ORJSONResponse
 
+# HTTP status returned for each domain error
+_STATUS_FOR: Dict[Type[DataFusionError], int] = {
+    OverlapError: 400,
+    TargetsError: 400,
+    ConfigurationError: 422,
+}
 
-def register_exception_handlers(app: FastAPI) -> None:
-    @app.exception_handler(OverlapError)
-    async def _overlap_handler(_, exc: OverlapError):  # type: ignore[no-untyped-def]
-        return _json_exc(400, str(exc))
 
-    @app.exception_handler(TargetsError)
-    async def _targets_handler(_, exc: TargetsError):  # type: ignore[no-untyped-def]
-        return _json_exc(400, str(exc))
+async def _handler(_: Request, exc: Exception) -> ORJSONResponse:
+    # Subclasses are routed here by Starlette too, so resolve via the MRO
+    status = next(_STATUS_FOR[cls] for cls in type(exc).__mro__ if cls in _STATUS_FOR)
+    return _json_exc(status, str(exc))
 
-    @app.exception_handler(ConfigurationError)
-    async def _config_handler(_, exc: ConfigurationError):  # type: ignore[no-untyped-def]
-        return _json_exc(422, str(exc))
 
+def register_exception_handlers(app: FastAPI) -> None:
+    for cls in _STATUS_FOR:
+        app.add_exception_handler(cls, _handler)
 
-def _json_exc(status: int, detail: str):  # type: ignore[no-untyped-def]
-    return JSONResponse(status_code=status, content={"detail": detail})
 
+def _json_exc(status: int, detail: str) -> ORJSONResponse:
+    return ORJSONResponse(status_code=status, content={"detail": detail})
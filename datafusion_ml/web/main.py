@@ -3,11 +3,23 @@ from __future__ import annotations
 import uvicorn
 
 from .app import create_app
+from .config import get_settings
 
 
 app = create_app()
 
 
 def main() -> None:
-    uvicorn.run("datafusion_ml.web.main:app", host="0.0.0.0", port=8000, reload=False)
+    settings = get_settings()
+    # loop/http "auto" pick uvloop and httptools, both shipped with uvicorn[standard]
+    uvicorn.run(
+        "datafusion_ml.web.main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=False,
+        workers=settings.workers,
+        loop="auto",
+        http="auto",
+        log_level=settings.log_level.lower(),
+    )
 
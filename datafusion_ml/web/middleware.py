@@ -1,176 +1,383 @@
 from __future__ import annotations
 
+import copy
+import hashlib
 import logging
+import math
+import threading
 import time
-from collections import defaultdict
-from typing import Callable, Awaitable
+from collections import OrderedDict
+from typing import Any
 
-from fastapi import HTTPException, Request, status
-from starlette.responses import Response
+from fastapi import status
+from prometheus_client import Counter, Histogram
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .responses import ORJSONResponse
+
+try:
+    import jwt
+    _HAS_JWT = True
+except ImportError:  # PyJWT is optional, see the "auth" extra
+    jwt = None  # type: ignore[assignment]
+    _HAS_JWT = False
 
 logger = logging.getLogger(__name__)
 
+# Endpoints exempt from rate limiting and authentication
+_SKIP_PATHS: frozenset[str] = frozenset({"/v1/health", "/health", "/metrics"})
+
+# Maximum number of verified tokens remembered by JWTAuthMiddleware
+_JWT_CACHE_SIZE = 4096
+
+# Request metrics are labelled by route template, never by the raw path:
+# paths carry job IDs and arbitrary 404 URLs, which would give every value
+# its own time series. New metrics must not label on user or job IDs either.
+_HTTP_REQUESTS = Counter(
+    "dfml_http_requests_total",
+    "HTTP requests handled, by method, route template and status code.",
+    ("method", "route", "status"),
+)
+_HTTP_LATENCY = Histogram(
+    "dfml_http_request_duration_seconds",
+    "HTTP request latency in seconds, by method and route template.",
+    ("method", "route"),
+)
+
 
 class RateLimiter:
-    """Simple in-memory rate limiter.
+    """Simple in-memory token-bucket rate limiter.
+    
+    Each client owns a bucket holding up to ``requests_per_minute`` tokens
+    that refills continuously at ``requests_per_minute / 60`` tokens per
+    second; a request spends one token. Buckets are refilled lazily on
+    access, so a check is O(1) and needs no periodic cleanup. At most
+    ``max_clients`` buckets are kept, evicting the least recently seen one,
+    so memory stays bounded however many client addresses show up.
     
     This is a basic implementation for development. For production,
     consider using Redis-based rate limiting.
     """
     
-    def __init__(self, requests_per_minute: int = 60):
+    def __init__(self, requests_per_minute: int = 60, max_clients: int = 100_000):
         self.requests_per_minute = requests_per_minute
-        self.requests: dict[str, list[float]] = defaultdict(list)
-        self._cleanup_interval = 60  # Clean up old entries every 60 seconds
-        self._last_cleanup = time.time()
+        self.max_clients = max_clients
+        self._capacity = float(requests_per_minute)
+        self._refill_per_second = requests_per_minute / 60.0
+        # client id -> (tokens, last refill time), least recently seen first
+        self.buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
     
-    def _cleanup_old_entries(self) -> None:
-        """Remove entries older than 1 minute."""
-        current_time = time.time()
-        if current_time - self._last_cleanup < self._cleanup_interval:
-            return
-        
-        cutoff_time = current_time - 60
-        for key in list(self.requests.keys()):
-            self.requests[key] = [
-                timestamp for timestamp in self.requests[key]
-                if timestamp > cutoff_time
-            ]
-            if not self.requests[key]:
-                del self.requests[key]
-        
-        self._last_cleanup = current_time
-    
-    def _get_client_id(self, request: Request) -> str:
-        """Get client identifier from request (IP address)."""
-        # Try to get real IP from proxy headers
-        forwarded_for = request.headers.get("X-Forwarded-For")
-        if forwarded_for:
-            return forwarded_for.split(",")[0].strip()
-        real_ip = request.headers.get("X-Real-IP")
-        if real_ip:
-            return real_ip
-        return request.client.host if request.client else "unknown"
-    
-    def is_allowed(self, request: Request) -> bool:
-        """Check if request is allowed based on rate limit."""
-        self._cleanup_old_entries()
-        client_id = self._get_client_id(request)
-        current_time = time.time()
-        
-        # Remove requests older than 1 minute
-        cutoff_time = current_time - 60
-        self.requests[client_id] = [
-            timestamp for timestamp in self.requests[client_id]
-            if timestamp > cutoff_time
-        ]
-        
-        # Check if limit exceeded
-        if len(self.requests[client_id]) >= self.requests_per_minute:
-            return False
-        
-        # Add current request
-        self.requests[client_id].append(current_time)
-        return True
-
-
-async def rate_limit_middleware(
-    request: Request,
-    call_next: Callable[[Request], Awaitable[Response]],
-    rate_limiter: RateLimiter,
-) -> Response:
+    def is_allowed(self, client_id: str) -> bool:
+        """Check if a request from ``client_id`` is allowed based on rate limit."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self.buckets.get(client_id)
+            if bucket is None:
+                tokens, last = self._capacity, now
+                if len(self.buckets) >= self.max_clients:
+                    # Evicting the least recently seen client only forgets
+                    # a bucket that has most likely refilled already
+                    self.buckets.popitem(last=False)
+            else:
+                tokens, last = bucket
+                self.buckets.move_to_end(client_id)
+            tokens = min(self._capacity, tokens + (now - last) * self._refill_per_second)
+            allowed = tokens >= 1.0
+            if allowed:
+                tokens -= 1.0
+            self.buckets[client_id] = (tokens, now)
+        return allowed
+
+
+def _client_ip(scope: Scope) -> str:
+    """Get the client IP from proxy headers or the ASGI scope.
+
+    Headers are scanned once without building a dict. The first entry of
+    ``X-Forwarded-For`` wins, then ``X-Real-IP``, then the peer address.
+    """
+    real_ip: bytes | None = None
+    name: bytes
+    value: bytes
+    for name, value in scope["headers"]:
+        if name == b"x-forwarded-for":
+            comma = value.find(b",")
+            first = (value if comma < 0 else value[:comma]).strip()
+            if first:
+                return first.decode("latin-1")
+        elif name == b"x-real-ip" and real_ip is None:
+            real_ip = value
+    if real_ip:
+        return real_ip.decode("latin-1")
+    client = scope.get("client")
+    return str(client[0]) if client else "unknown"
+
+
+async def _send_error(
+    scope: Scope,
+    receive: Receive,
+    send: Send,
+    status_code: int,
+    detail: str,
+    headers: dict[str, str] | None = None,
+) -> None:
+    response = ORJSONResponse(status_code=status_code, content={"detail": detail}, headers=headers)
+    await response(scope, receive, send)
+
+
+class RateLimitMiddleware:
     """Rate limiting middleware.
     
-    Returns 429 Too Many Requests if rate limit is exceeded.
+    Responds with 429 Too Many Requests if rate limit is exceeded. Only the
+    scope is inspected, so requests are passed on without wrapping the body
+    or the response.
     """
-    # Skip rate limiting for health and metrics endpoints
-    if request.url.path in ["/v1/health", "/health", "/metrics"]:
-        return await call_next(request)
-    
-    if not rate_limiter.is_allowed(request):
-        logger.warning(
-            f"Rate limit exceeded for client {rate_limiter._get_client_id(request)}"
-        )
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail=f"Rate limit exceeded. Maximum {rate_limiter.requests_per_minute} requests per minute."
-        )
-    
-    return await call_next(request)
 
+    def __init__(self, app: ASGIApp, rate_limiter: RateLimiter) -> None:
+        self.app = app
+        self.rate_limiter = rate_limiter
 
-async def jwt_auth_middleware(
-    request: Request,
-    call_next: Callable[[Request], Awaitable[Response]],
-    jwt_secret: str | None,
-    jwt_algorithm: str = "HS256",
-) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Skip rate limiting for health and metrics endpoints
+        if scope["type"] != "http" or scope["path"] in _SKIP_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        client_id = _client_ip(scope)
+        if not self.rate_limiter.is_allowed(client_id):
+            logger.warning(f"Rate limit exceeded for client {client_id}")
+            await _send_error(
+                scope,
+                receive,
+                send,
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                f"Rate limit exceeded. Maximum {self.rate_limiter.requests_per_minute} requests per minute.",
+            )
+            return
+
+        await self.app(scope, receive, send)
+
+
+class JWTAuthMiddleware:
     """JWT authentication middleware.
     
     Validates JWT tokens from Authorization header if JWT is enabled.
-    If jwt_secret is None, authentication is disabled.
+    If jwt_secret is None, authentication is disabled. The decoded payload
+    is available to route handlers as ``request.state.user``.
+
+    With ``cache_enabled``, verified payloads are remembered per token (keyed
+    by a BLAKE2b digest, so raw tokens are not kept) until their ``exp``
+    claim, so clients reusing a token skip signature verification. The
+    least recently used entry is evicted beyond ``_JWT_CACHE_SIZE`` tokens.
+    Each request gets its own copy of the cached payload, so a handler
+    changing ``request.state.user`` cannot affect later requests.
     """
-    # Skip authentication if not configured
-    if jwt_secret is None:
-        return await call_next(request)
-    
-    # Skip authentication for health and metrics endpoints
-    if request.url.path in ["/v1/health", "/health", "/metrics"]:
-        return await call_next(request)
-    
-    # Extract token from Authorization header
-    auth_header = request.headers.get("Authorization")
-    if not auth_header:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Missing Authorization header",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    # Parse Bearer token
-    if not auth_header.startswith("Bearer "):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid Authorization header format. Expected 'Bearer <token>'",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    token = auth_header[7:]  # Remove "Bearer " prefix
-    
-    # Validate token using PyJWT
-    try:
-        import jwt  # type: ignore[import-untyped]
-    except ImportError:
-        logger.error(
-            "JWT authentication enabled but PyJWT not installed. "
-            "Install with: pip install 'datafusion-ml[auth]' or pip install PyJWT"
-        )
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="JWT authentication not properly configured. PyJWT library required."
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        jwt_secret: str | None,
+        jwt_algorithm: str = "HS256",
+        cache_enabled: bool = True,
+    ) -> None:
+        self.app = app
+        self.jwt_secret = jwt_secret
+        self.jwt_algorithm = jwt_algorithm
+        # token digest -> (expiry timestamp, payload), least recently used first
+        self._cache: OrderedDict[bytes, tuple[float, dict[str, Any]]] | None = (
+            OrderedDict() if cache_enabled else None
         )
-    
-    try:
-        payload = jwt.decode(
-            token,
-            jwt_secret,
-            algorithms=[jwt_algorithm],
+
+    def _decode(self, token: str) -> dict[str, Any]:
+        """Verify ``token``, reusing a cached payload while it is unexpired."""
+        if self._cache is None:
+            return jwt.decode(token, self.jwt_secret, algorithms=[self.jwt_algorithm])
+        key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        cached = self._cache.get(key)
+        if cached is not None:
+            if cached[0] > time.time():
+                self._cache.move_to_end(key)
+                return copy.deepcopy(cached[1])
+            # Expired: decode again so the client gets the usual error
+            del self._cache[key]
+        payload: dict[str, Any] = jwt.decode(
+            token, self.jwt_secret, algorithms=[self.jwt_algorithm]
         )
+        exp = payload.get("exp")
+        self._cache[key] = (math.inf if exp is None else float(exp), payload)
+        if len(self._cache) > _JWT_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return copy.deepcopy(payload)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Skip authentication if not configured, and for health and metrics endpoints
+        if (
+            scope["type"] != "http"
+            or self.jwt_secret is None
+            or scope["path"] in _SKIP_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        bearer = {"WWW-Authenticate": "Bearer"}
+        # Extract token from Authorization header
+        auth_header = dict(scope["headers"]).get(b"authorization")
+        if not auth_header:
+            await _send_error(
+                scope, receive, send,
+                status.HTTP_401_UNAUTHORIZED, "Missing Authorization header", bearer,
+            )
+            return
+
+        # Parse Bearer token
+        if not auth_header.startswith(b"Bearer "):
+            await _send_error(
+                scope, receive, send,
+                status.HTTP_401_UNAUTHORIZED,
+                "Invalid Authorization header format. Expected 'Bearer <token>'",
+                bearer,
+            )
+            return
+
+        token = auth_header[7:].decode("latin-1")  # Remove "Bearer " prefix
+
+        # Validate token using PyJWT; its presence is checked at startup
+        try:
+            payload = self._decode(token)
+        except jwt.ExpiredSignatureError:
+            await _send_error(
+                scope, receive, send,
+                status.HTTP_401_UNAUTHORIZED, "Token has expired", bearer,
+            )
+            return
+        except jwt.InvalidTokenError as e:
+            logger.debug(f"Invalid JWT token: {str(e)}")
+            await _send_error(
+                scope, receive, send,
+                status.HTTP_401_UNAUTHORIZED, "Invalid token", bearer,
+            )
+            return
+
         # Attach user info to request state for use in route handlers
-        request.state.user = payload  # type: ignore[attr-defined]
-        
-    except jwt.ExpiredSignatureError:  # type: ignore[name-defined]
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has expired",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    except jwt.InvalidTokenError as e:  # type: ignore[name-defined]
-        logger.debug(f"Invalid JWT token: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    return await call_next(request)
+        scope.setdefault("state", {})["user"] = payload
+        await self.app(scope, receive, send)
+
+
+_BODY_TOO_LARGE = "Request entity too large"
+
+
+class BodySizeLimitMiddleware:
+    """Reject request bodies larger than ``max_bytes`` with 413.
+
+    A declared ``Content-Length`` is checked before any body is read; the
+    server enforces it as the body's framing, so such requests are passed on
+    untouched when within the limit. Bodies without one are counted as they
+    stream through ``receive`` and rejected on the first chunk that crosses
+    the limit, so an oversized body is never buffered in full.
+    ``multipart/form-data`` uploads are skipped; their files are validated
+    by the upload routes. Other multipart types are limited as usual.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int) -> None:
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        content_type = content_length = b""
+        name: bytes
+        value: bytes
+        for name, value in scope["headers"]:
+            if name == b"content-type":
+                content_type = value
+            elif name == b"content-length":
+                content_length = value
+        if content_type.startswith(b"multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+        if content_length.isdigit():
+            if int(content_length) > self.max_bytes:
+                response = ORJSONResponse(status_code=413, content={"detail": _BODY_TOO_LARGE})
+                await response(scope, receive, send)
+            else:
+                await self.app(scope, receive, send)
+            return
+
+        total = 0
+        rejected = False
+
+        async def receive_limited() -> Message:
+            nonlocal total, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                total += len(message.get("body", b""))
+                if total > self.max_bytes:
+                    # Answer 413 here and stop pulling the body; the app
+                    # sees a disconnect and whatever it sends is dropped
+                    rejected = True
+                    response = ORJSONResponse(status_code=413, content={"detail": _BODY_TOO_LARGE})
+                    await response(scope, receive, send)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def send_unless_rejected(message: Message) -> None:
+            if not rejected:
+                await send(message)
+
+        try:
+            await self.app(scope, receive_limited, send_unless_rejected)
+        except Exception:
+            if not rejected:
+                raise
+
+
+def _route_template(scope: Scope) -> str:
+    """Return the path template of the route that handled ``scope``.
+
+    Routing stores the matched route on the scope. FastAPI keeps routes of
+    included routers unprefixed and records the effective (prefixed) route
+    separately, so that one is preferred. Unmatched requests share a single
+    ``"unmatched"`` label.
+    """
+    effective = scope.get("fastapi", {}).get("effective_route_context")
+    route = effective if effective is not None else scope.get("route")
+    template = getattr(route, "path_format", None)
+    return template if isinstance(template, str) else "unmatched"
+
+
+class RequestMetricsMiddleware:
+    """Count requests and observe their latency for Prometheus.
+
+    Labels are the HTTP method, the route template (see ``_route_template``)
+    and the response status, so the number of series stays bounded by the
+    number of routes.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_recording_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_recording_status)
+        finally:
+            method = scope["method"]
+            route = _route_template(scope)
+            _HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+            _HTTP_LATENCY.labels(method, route).observe(time.perf_counter() - start)
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+from starlette.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson.
+
+    Serializes NumPy scalars/arrays natively and emits NaN as ``null``, which
+    makes it suitable for returning DataFrame-derived payloads without a
+    Pydantic round-trip.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
@@ -1,22 +1,37 @@
 from __future__ import annotations
 
-import io
+import asyncio
+import heapq
 import json
 import logging
 import os
+import sys
+import tempfile
 import threading
 import time
 import uuid
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Annotated, Any, BinaryIO, Callable, Dict, List, Optional, Tuple, TypeVar, Union
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
 import pyarrow.parquet as pq
-from fastapi import APIRouter, BackgroundTasks, File, HTTPException, UploadFile
-
-from ...service.fusion_service import perform_fusion
-from ..config import APISettings
-from ..schemas import FuseRequest, FuseResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, Request, UploadFile
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
+
+from ...service.fusion_service import (
+    ARROW_STREAM_MEDIA_TYPE,
+    perform_fusion,
+    perform_fusion_arrow,
+    perform_fusion_arrow_df,
+    perform_fusion_df,
+)
+from ..config import APISettings, get_settings
+from ..responses import ORJSONResponse
+from ..schemas import FuseOptions, FuseRequest, FuseResponse
 
 
 router = APIRouter()
@@ -25,15 +40,77 @@ logger = logging.getLogger(__name__)
 # Job store with TTL (Time To Live) in seconds
 # Jobs older than JOB_TTL_SECONDS will be automatically cleaned up
 JOB_TTL_SECONDS = 3600  # 1 hour default
-_JOB_STORE: Dict[str, Dict[str, Any]] = {}
-_JOB_TIMESTAMPS: Dict[str, float] = {}
-# Lock for thread-safe access to job store
-_JOB_STORE_LOCK = threading.Lock()
+# Seconds between background sweeps for expired jobs
+JOB_CLEANUP_INTERVAL_SECONDS = 60
+# The store is split into shards, each with its own lock, so concurrent polls
+# of different jobs rarely wait on each other
+_JOB_SHARD_COUNT = 16
+
+
+class _JobShard:
+    """One slice of the job store; its lock guards every mutation.
+
+    Each job is stored as a single ``(data, timestamp)`` entry, so a lookup
+    is one atomic ``dict.get`` and readers never need the lock.
+    """
+
+    __slots__ = ("lock", "jobs", "expiry", "waiters")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.jobs: Dict[str, Tuple[Dict[str, Any], float]] = {}
+        # Min-heap of (expiry time, job id). A job gets a new entry on every
+        # update; entries superseded by a later timestamp are skipped on pop.
+        self.expiry: List[Tuple[float, str]] = []
+        # Status requests long-polling a pending job, woken once it finishes
+        self.waiters: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+
+
+_JOB_SHARDS: List[_JobShard] = [_JobShard() for _ in range(_JOB_SHARD_COUNT)]
 # Persistence settings (loaded from config)
 _PERSISTENCE_ENABLED = False
 _PERSISTENCE_PATH: Path | None = None
 
 
+def _job_shard(job_id: str) -> _JobShard:
+    return _JOB_SHARDS[hash(job_id) % _JOB_SHARD_COUNT]
+
+
+def _put_job(job_id: str, job_data: Dict[str, Any], timestamp: float) -> None:
+    shard = _job_shard(job_id)
+    with shard.lock:
+        shard.jobs[job_id] = (job_data, timestamp)
+        heapq.heappush(shard.expiry, (timestamp + JOB_TTL_SECONDS, job_id))
+        waiters = shard.waiters.pop(job_id, []) if job_data.get("status") != "pending" else []
+    # Jobs finish on worker threads; wake each waiter on its own event loop
+    for loop, event in waiters:
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:  # loop already closed
+            pass
+
+
+def _get_job(job_id: str) -> Dict[str, Any] | None:
+    """Return the job's data, dropping it on access if it has expired."""
+    shard = _job_shard(job_id)
+    entry = shard.jobs.get(job_id)
+    if entry is None:
+        return None
+    job_data, timestamp = entry
+    if time.time() - timestamp <= JOB_TTL_SECONDS:
+        return job_data
+    with shard.lock:
+        # Only drop the entry seen above, not one written since
+        replaced = shard.jobs.get(job_id) is not entry
+        if not replaced:
+            # Its heap entry is skipped by the next sweep
+            del shard.jobs[job_id]
+    if replaced:
+        return _get_job(job_id)
+    _delete_job_file(job_id)
+    return None
+
+
 def _init_persistence(settings: APISettings) -> None:
     """Initialize job persistence if enabled."""
     global _PERSISTENCE_ENABLED, _PERSISTENCE_PATH
@@ -115,8 +192,7 @@ def _load_persisted_jobs() -> None:
                 
                 # Only load jobs that haven't expired
                 if current_time - timestamp < JOB_TTL_SECONDS:
-                    _JOB_STORE[job_id] = job_data
-                    _JOB_TIMESTAMPS[job_id] = timestamp
+                    _put_job(job_id, job_data, timestamp)
                     loaded_count += 1
                 else:
                     # Delete expired jobs
@@ -133,117 +209,268 @@ def _load_persisted_jobs() -> None:
 def _cleanup_old_jobs() -> None:
     """Remove jobs older than JOB_TTL_SECONDS from the store.
     
-    This function is thread-safe and should be called regularly to prevent
-    memory leaks from accumulating old job data.
+    This function is thread-safe and is run periodically by
+    ``cleanup_jobs_periodically`` rather than on every request. Each shard is
+    swept under its own lock, popping only already-expired entries off its
+    expiry heap instead of scanning every job.
     """
-    with _JOB_STORE_LOCK:
-        current_time = time.time()
-        expired_jobs = [
-            job_id
-            for job_id, timestamp in _JOB_TIMESTAMPS.items()
-            if current_time - timestamp > JOB_TTL_SECONDS
-        ]
-        if expired_jobs:
-            logger.info(f"Cleaning up {len(expired_jobs)} expired job(s)")
-            for job_id in expired_jobs:
-                _JOB_STORE.pop(job_id, None)
-                _JOB_TIMESTAMPS.pop(job_id, None)
-                # Delete persisted file if persistence is enabled
-                _delete_job_file(job_id)
-
-
-@router.post("/fuse", response_model=FuseResponse)
-def fuse(req: FuseRequest) -> FuseResponse:
-    settings = APISettings.from_env()
+    current_time = time.time()
+    expired_jobs: List[str] = []
+    for shard in _JOB_SHARDS:
+        with shard.lock:
+            while shard.expiry and shard.expiry[0][0] < current_time:
+                expires, job_id = heapq.heappop(shard.expiry)
+                entry = shard.jobs.get(job_id)
+                # Skip jobs already removed or updated since this entry
+                if entry is not None and entry[1] + JOB_TTL_SECONDS <= expires:
+                    del shard.jobs[job_id]
+                    expired_jobs.append(job_id)
+    if expired_jobs:
+        logger.info(f"Cleaning up {len(expired_jobs)} expired job(s)")
+        for job_id in expired_jobs:
+            # Delete persisted file if persistence is enabled
+            _delete_job_file(job_id)
+
+
+async def cleanup_jobs_periodically(interval_s: float = JOB_CLEANUP_INTERVAL_SECONDS) -> None:
+    """Sweep expired jobs every ``interval_s`` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval_s)
+        try:
+            await run_in_threadpool(_cleanup_old_jobs)
+        except Exception as e:  # noqa: BLE001
+            logger.error(f"Job cleanup failed: {str(e)}", exc_info=True)
+
+
+_T = TypeVar("_T")
+
+
+async def _run_offloaded(request: Request, func: Callable[..., _T], *args: Any) -> _T:
+    """Run fusion off the event loop, in the app's process pool if one is configured."""
+    pool = getattr(request.app.state, "fusion_pool", None)
+    if pool is not None:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, func, *args)
+    return await run_in_threadpool(func, *args)
+
+
+def _check_row_limit(req: FuseOptions) -> None:
+    settings = get_settings()
     # Enforce row limit from settings if provided
     if req.row_limit is not None and req.row_limit > settings.max_rows:
         raise HTTPException(status_code=413, detail="Row limit exceeds configured maximum")
-    return perform_fusion(req)
 
 
-def _run_fusion_job(job_id: str, req: FuseRequest) -> None:
-    """Run fusion job in background and update job store."""
+@router.post("/fuse", response_model=FuseResponse, response_class=ORJSONResponse)
+async def fuse(req: FuseRequest, request: Request) -> ORJSONResponse:
+    _check_row_limit(req)
+    result = await _run_offloaded(request, perform_fusion, req)
+    # Serialize directly with orjson instead of re-validating through response_model
+    return ORJSONResponse(dict(result))
+
+
+@router.post(
+    "/fuse/arrow",
+    response_class=StreamingResponse,
+    responses={200: {"content": {ARROW_STREAM_MEDIA_TYPE: {}}}},
+)
+async def fuse_arrow(req: FuseRequest, request: Request) -> StreamingResponse:
+    """Same as ``/fuse`` but returns the parts as back-to-back Arrow IPC streams.
+
+    Read them with ``pyarrow.ipc.open_stream`` until the body is exhausted; each
+    stream's schema metadata names its part under ``datafusion.part``.
+    """
+    _check_row_limit(req)
+    buffers = await _run_offloaded(request, perform_fusion_arrow, req)
+    return StreamingResponse(
+        (memoryview(buf) for buf in buffers), media_type=ARROW_STREAM_MEDIA_TYPE
+    )
+
+
+def _read_ipc_pair(body: bytes) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Decode datasets A and B from two back-to-back Arrow IPC streams."""
+    source = pa.BufferReader(body)
+    try:
+        table_a = pa.ipc.open_stream(source).read_all()
+        table_b = pa.ipc.open_stream(source).read_all()
+    except (pa.ArrowInvalid, OSError) as e:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Body must be two Arrow IPC streams (dataset A, then B): {str(e)}",
+        )
+    df_a: pd.DataFrame = table_a.to_pandas(self_destruct=True, split_blocks=True)
+    df_b: pd.DataFrame = table_b.to_pandas(self_destruct=True, split_blocks=True)
+    return df_a, df_b
+
+
+@router.post(
+    "/fuse/ipc",
+    response_class=StreamingResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {ARROW_STREAM_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}}},
+        }
+    },
+    responses={200: {"content": {ARROW_STREAM_MEDIA_TYPE: {}}}},
+)
+async def fuse_ipc(
+    request: Request, options: Annotated[FuseOptions, Query()]
+) -> StreamingResponse:
+    """Binary fast path: Arrow IPC in, Arrow IPC out.
+
+    The body holds dataset A and dataset B as two back-to-back Arrow IPC
+    streams and the options come as query parameters, so no JSON is parsed
+    or validated per row. The response is the same as ``/fuse/arrow``.
+    """
+    _check_row_limit(options)
+    body = await request.body()
+    df_a, df_b = await run_in_threadpool(_read_ipc_pair, body)
+    buffers = await _run_offloaded(request, perform_fusion_arrow_df, df_a, df_b, options)
+    return StreamingResponse(
+        (memoryview(buf) for buf in buffers), media_type=ARROW_STREAM_MEDIA_TYPE
+    )
+
+
+def _finish_job(job_id: str, compute: Callable[[], FuseResponse]) -> None:
+    """Run ``compute`` and record the job's outcome in the job store."""
     try:
-        result = perform_fusion(req)
-        timestamp = time.time()
-        job_data = {"status": "done", "result": result.model_dump()}  # type: ignore[attr-defined]
-        with _JOB_STORE_LOCK:
-            _JOB_STORE[job_id] = job_data
-            _JOB_TIMESTAMPS[job_id] = timestamp
-        _save_job(job_id, job_data, timestamp)
+        result = compute()
+        job_data = {"status": "done", "result": result.model_dump()}
         logger.info(f"Job {job_id} completed successfully")
     except Exception as e:  # noqa: BLE001
-        timestamp = time.time()
         job_data = {"status": "error", "error": str(e)}
-        with _JOB_STORE_LOCK:
-            _JOB_STORE[job_id] = job_data
-            _JOB_TIMESTAMPS[job_id] = timestamp
-        _save_job(job_id, job_data, timestamp)
         logger.error(f"Job {job_id} failed: {str(e)}", exc_info=True)
+    timestamp = time.time()
+    _put_job(job_id, job_data, timestamp)
+    _save_job(job_id, job_data, timestamp)
+
+
+def _run_fusion_job(job_id: str, req: FuseRequest) -> None:
+    """Run fusion job in background and update job store."""
+    _finish_job(job_id, lambda: perform_fusion(req))
 
 
 @router.post("/fuse/async")
-def fuse_async(req: FuseRequest, tasks: BackgroundTasks) -> Dict[str, str]:
-    """Create a new async fusion job."""
-    settings = APISettings.from_env()
+def fuse_async(req: FuseRequest, request: Request, tasks: BackgroundTasks) -> Dict[str, str]:
+    """Create a new async fusion job.
+
+    With a process pool configured (``DFML_FUSION_WORKERS``) the job runs
+    there and its result is stored by a completion callback; otherwise it
+    runs as a background task on the threadpool.
+    """
+    settings = get_settings()
     # Initialize persistence on first use
     if _PERSISTENCE_PATH is None:
         _init_persistence(settings)
     
-    # Cleanup old jobs before creating new one
-    _cleanup_old_jobs()
-    
-    job_id = str(uuid.uuid4())
+    # Hex form is shorter to hash; interned so status polls hit the identity fast path
+    job_id = sys.intern(uuid.uuid4().hex)
     timestamp = time.time()
     job_data = {"status": "pending"}
-    with _JOB_STORE_LOCK:
-        _JOB_STORE[job_id] = job_data
-        _JOB_TIMESTAMPS[job_id] = timestamp
+    _put_job(job_id, job_data, timestamp)
     _save_job(job_id, job_data, timestamp)
-    tasks.add_task(_run_fusion_job, job_id, req)
+    pool = getattr(request.app.state, "fusion_pool", None)
+    if pool is not None:
+        future = pool.submit(perform_fusion, req)
+        future.add_done_callback(lambda done: _finish_job(job_id, done.result))
+    else:
+        tasks.add_task(_run_fusion_job, job_id, req)
     logger.info(f"Created async job {job_id}")
     return {"job_id": job_id}
 
 
-@router.get("/fuse/async/{job_id}")
-def fuse_async_status(job_id: str) -> Dict[str, Any]:
-    """Get status of an async fusion job."""
-    settings = APISettings.from_env()
+def _lookup_job(job_id: str) -> Dict[str, Any]:
+    """Return the job's data from memory or, after a restart, from disk."""
+    settings = get_settings()
     # Initialize persistence on first use
     if _PERSISTENCE_PATH is None:
         _init_persistence(settings)
     
-    # Cleanup old jobs on access
-    _cleanup_old_jobs()
-    
-    with _JOB_STORE_LOCK:
-        data = _JOB_STORE.get(job_id)
+    data = _get_job(job_id)
     
     # Try to load from disk if not in memory (e.g., after restart)
     if not data and _PERSISTENCE_ENABLED:
         loaded = _load_job(job_id)
         if loaded:
             job_data, timestamp = loaded
-            with _JOB_STORE_LOCK:
-                _JOB_STORE[job_id] = job_data
-                _JOB_TIMESTAMPS[job_id] = timestamp
-            data = job_data
+            if time.time() - timestamp <= JOB_TTL_SECONDS:
+                _put_job(job_id, job_data, timestamp)
+                data = job_data
+            else:
+                _delete_job_file(job_id)
     
     if not data:
         raise HTTPException(status_code=404, detail="Job not found")
     return data
 
 
-def _validate_file_size(file_bytes: bytes, max_size_mb: int) -> None:
+async def _wait_for_job(job_id: str, timeout: float) -> None:
+    """Wait up to ``timeout`` seconds for a pending job to finish."""
+    shard = _job_shard(job_id)
+    event = asyncio.Event()
+    waiter = (asyncio.get_running_loop(), event)
+    with shard.lock:
+        entry = shard.jobs.get(job_id)
+        if entry is None or entry[0].get("status") != "pending":
+            return
+        shard.waiters.setdefault(job_id, []).append(waiter)
+    try:
+        await asyncio.wait_for(event.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        with shard.lock:
+            waiters = shard.waiters.get(job_id)
+            if waiters and waiter in waiters:
+                waiters.remove(waiter)
+                if not waiters:
+                    del shard.waiters[job_id]
+
+
+@router.get("/fuse/async/{job_id}")
+async def fuse_async_status(
+    job_id: str,
+    wait: Annotated[
+        float,
+        Query(ge=0, le=30, description="Seconds to wait for a pending job to finish before answering"),
+    ] = 0,
+) -> Dict[str, Any]:
+    """Get status of an async fusion job.
+
+    With ``wait`` the request long-polls: it returns as soon as the job is
+    done or failed, or with the pending status once ``wait`` seconds passed.
+    """
+    job_id = sys.intern(job_id)
+    data = await run_in_threadpool(_lookup_job, job_id)
+    if wait and data.get("status") == "pending":
+        await _wait_for_job(job_id, wait)
+        data = await run_in_threadpool(_lookup_job, job_id)
+    return data
+
+
+def _validate_file_size(size: int, max_size_mb: int) -> None:
     """Validate file size before processing."""
     max_bytes = max_size_mb * 1024 * 1024
-    if len(file_bytes) > max_bytes:
+    if size > max_bytes:
         raise HTTPException(
             status_code=413,
-            detail=f"File size ({len(file_bytes) / 1024 / 1024:.2f} MB) exceeds maximum allowed size ({max_size_mb} MB)"
+            detail=f"File size ({size / 1024 / 1024:.2f} MB) exceeds maximum allowed size ({max_size_mb} MB)"
         )
 
 
+# Leading 4 bytes of the binary formats recognised on upload: Parquet
+# ("PAR1"), Excel .xlsx (ZIP local file, empty and spanned archive headers)
+# and legacy .xls (OLE2 compound file)
+_MAGIC_NUMBERS: Dict[bytes, str] = {
+    b"PAR1": "parquet",
+    b"PK\x03\x04": "excel",
+    b"PK\x05\x06": "excel",
+    b"PK\x07\x08": "excel",
+    b"\xd0\xcf\x11\xe0": "excel",
+}
+
+
 def _detect_file_type(file_bytes: bytes, filename: Optional[str] = None) -> str:
     """
     Detect file type using magic numbers and filename.
@@ -254,13 +481,12 @@ def _detect_file_type(file_bytes: bytes, filename: Optional[str] = None) -> str:
     if len(file_bytes) == 0:
         raise HTTPException(status_code=422, detail="File is empty")
     
-    # Parquet magic number: first 4 bytes are "PAR1" (0x50415231)
-    if len(file_bytes) >= 4 and file_bytes[:4] == b"PAR1":
+    # One lookup on the leading 4 bytes; the filename is only consulted when
+    # no known magic number matched
+    kind = _MAGIC_NUMBERS.get(bytes(file_bytes[:4]))
+    if kind == "parquet":
         return "parquet"
-    
-    # Check for other binary formats that should be rejected
-    # Excel files (XLSX starts with PK\x03\x04 - ZIP signature)
-    if len(file_bytes) >= 4 and file_bytes[:2] == b"PK":
+    if kind == "excel":
         raise HTTPException(
             status_code=422,
             detail="Excel files (.xlsx, .xls) are not supported. Please convert to CSV or Parquet."
@@ -270,9 +496,12 @@ def _detect_file_type(file_bytes: bytes, filename: Optional[str] = None) -> str:
     if filename:
         filename_lower = filename.lower()
         if filename_lower.endswith(".parquet"):
-            # If filename suggests parquet but magic number doesn't match, warn
+            # Only the magic number routes to the Parquet reader
             logger.warning(f"Filename suggests Parquet but magic number doesn't match: {filename}")
-            return "parquet"
+            raise HTTPException(
+                status_code=422,
+                detail="File does not have Parquet magic number. Please ensure the file is a valid Parquet file."
+            )
         if filename_lower.endswith((".xlsx", ".xls")):
             raise HTTPException(
                 status_code=422,
@@ -283,35 +512,114 @@ def _detect_file_type(file_bytes: bytes, filename: Optional[str] = None) -> str:
     return "csv"
 
 
-def _read_csv(file_bytes: bytes) -> pd.DataFrame:
+# An upload's contents: bytes while in memory, otherwise the spooled file
+_UploadSource = Union[bytes, BinaryIO]
+
+
+def _source_reader(source: _UploadSource) -> Union[pa.BufferReader, BinaryIO]:
+    """Return a reader positioned at the start of ``source``."""
+    if isinstance(source, bytes):
+        return pa.BufferReader(source)
+    source.seek(0)
+    return source
+
+
+def _source_head(source: _UploadSource, n: int) -> bytes:
+    """Return the first ``n`` bytes of ``source``."""
+    if isinstance(source, bytes):
+        return source[:n]
+    source.seek(0)
+    return source.read(n)
+
+
+_CSV_READ_OPTIONS = pacsv.ReadOptions(use_threads=True, block_size=8 << 20)
+# Empty fields become missing values, as with pd.read_csv
+_CSV_CONVERT_OPTIONS = pacsv.ConvertOptions(strings_can_be_null=True)
+
+
+# Integers from here on overflow int64; Arrow widens them to float64
+_INT64_LIMIT = float(2**63)
+
+
+def _arrow_differs_from_pandas(table: pa.Table) -> bool:
+    """Whether Arrow parsed ``table`` in a way ``pd.read_csv`` would not.
+
+    pandas renames duplicate headers (``y``, ``y.1``), rejects bytes that are
+    not UTF-8 and keeps integers beyond int64 exact, where Arrow keeps the
+    duplicates, yields ``binary`` columns and rounds them to float64.
+    """
+    names = table.column_names
+    if len(set(names)) != len(names):
+        return True
+    for field, column in zip(table.schema, table.columns):
+        if pa.types.is_binary(field.type) or pa.types.is_large_binary(field.type):
+            return True
+        if pa.types.is_floating(field.type):
+            bounds = pc.min_max(column)
+            low, high = bounds["min"].as_py(), bounds["max"].as_py()
+            if high is not None and (high >= _INT64_LIMIT or low <= -_INT64_LIMIT):
+                return True
+    return False
+
+
+def _read_csv_arrow(source: _UploadSource) -> Optional[pd.DataFrame]:
+    """Parse a CSV upload with Arrow's multithreaded reader.
+
+    Arrow infers dates and timestamps where pandas keeps the text, so files
+    with such columns are re-read with them typed as strings. Returns None
+    for files Arrow reads differently from ``pd.read_csv`` in other ways
+    (see ``_arrow_differs_from_pandas``); those are left to pandas.
+    """
+    table = pacsv.read_csv(
+        _source_reader(source),
+        read_options=_CSV_READ_OPTIONS,
+        convert_options=_CSV_CONVERT_OPTIONS,
+    )
+    if _arrow_differs_from_pandas(table):
+        return None
+    temporal = {f.name: pa.string() for f in table.schema if pa.types.is_temporal(f.type)}
+    if temporal:
+        table = pacsv.read_csv(
+            _source_reader(source),
+            read_options=_CSV_READ_OPTIONS,
+            convert_options=pacsv.ConvertOptions(strings_can_be_null=True, column_types=temporal),
+        )
+    df: pd.DataFrame = table.to_pandas(self_destruct=True, split_blocks=True)
+    return df
+
+
+_CSV_DELIMITERS = (b",", b";", b"\t", b"\n", b"\r")
+
+
+def _read_csv(source: _UploadSource) -> pd.DataFrame:
     """Read CSV file with error handling and validation.
     
     Validates that the file is actually a CSV by attempting to parse it.
     """
-    if len(file_bytes) == 0:
+    preview = _source_head(source, 1024)
+    if not preview:
         raise HTTPException(status_code=422, detail="CSV file is empty")
     
     # Basic CSV validation: should contain at least one newline or comma
-    # This helps catch cases where binary files are misidentified as CSV
-    try:
-        # Try to decode as UTF-8 first (most common encoding)
-        text_preview = file_bytes[:1024].decode('utf-8', errors='ignore')
-        if not any(c in text_preview for c in [',', ';', '\t', '\n', '\r']):
-            raise HTTPException(
-                status_code=422,
-                detail="File does not appear to be a valid CSV (no delimiters found). "
-                       "Please ensure the file is a CSV or Parquet file."
-            )
-    except UnicodeDecodeError:
-        # If we can't decode as UTF-8, it's likely not a text file
+    # This helps catch cases where binary files are misidentified as CSV.
+    # The delimiters are ASCII, so the raw bytes are searched directly (memchr)
+    # instead of decoding a text preview first
+    if not any(d in preview for d in _CSV_DELIMITERS):
         raise HTTPException(
             status_code=422,
-            detail="File does not appear to be a valid CSV (not UTF-8 text). "
+            detail="File does not appear to be a valid CSV (no delimiters found). "
                    "Please ensure the file is a CSV or Parquet file."
         )
     
     try:
-        df = pd.read_csv(io.BytesIO(file_bytes))
+        try:
+            df = _read_csv_arrow(source)
+        except pa.ArrowInvalid:
+            df = None
+        if df is None:
+            # pandas is more forgiving and gives the friendlier errors below;
+            # BufferReader hands it the upload without the copy BytesIO makes
+            df = pd.read_csv(_source_reader(source))
         if df.empty:
             raise HTTPException(status_code=422, detail="CSV file contains no data rows")
         return df
@@ -334,24 +642,19 @@ def _read_csv(file_bytes: bytes) -> pd.DataFrame:
         )
 
 
-def _read_parquet(file_bytes: bytes) -> pd.DataFrame:
+def _read_parquet(source: _UploadSource) -> pd.DataFrame:
     """Read Parquet file with error handling and validation.
     
-    Validates that the file is actually a Parquet file by attempting to parse it.
+    Only called once ``_detect_file_type`` has matched the Parquet magic
+    number; the file is otherwise validated by attempting to parse it.
     """
-    if len(file_bytes) < 4:
-        raise HTTPException(status_code=422, detail="Parquet file is too small or corrupted")
-    
-    # Verify magic number again (defense in depth)
-    if file_bytes[:4] != b"PAR1":
-        raise HTTPException(
-            status_code=422,
-            detail="File does not have Parquet magic number. Please ensure the file is a valid Parquet file."
-        )
-    
     try:
-        table = pq.read_table(io.BytesIO(file_bytes))
-        df = table.to_pandas()
+        # The upload is read in place; self_destruct frees each Arrow column
+        # once converted, so the table and frame never both hold the full
+        # dataset
+        table = pq.read_table(_source_reader(source), use_threads=True, pre_buffer=True)
+        df: pd.DataFrame = table.to_pandas(self_destruct=True, split_blocks=True, use_threads=True)
+        del table
         if df.empty:
             raise HTTPException(status_code=422, detail="Parquet file contains no data rows")
         return df
@@ -367,10 +670,62 @@ def _read_parquet(file_bytes: bytes) -> pd.DataFrame:
         )
 
 
-@router.post("/fuse/upload", response_model=FuseResponse)
-async def fuse_upload(
-    file_a: UploadFile = File(..., description="CSV or Parquet for dataset A"),
-    file_b: UploadFile = File(..., description="CSV or Parquet for dataset B"),
+def _upload_source(upload: UploadFile, max_size_mb: int) -> _UploadSource:
+    """Return what to parse an upload from, without copying files spooled to disk.
+
+    Starlette buffers uploads in a SpooledTemporaryFile. Small ones are still
+    in memory and are returned as bytes; for ones that rolled over to disk the
+    file itself is returned, which the readers stream from block by block
+    rather than from a second full copy in memory. Any other file object is
+    read into bytes. The size is taken from the file position and checked
+    before anything is read.
+    """
+    f = upload.file
+    size = f.seek(0, os.SEEK_END)
+    _validate_file_size(size, max_size_mb)
+    f.seek(0)
+    if size == 0:
+        return b""
+    # Same rollover check as UploadFile itself; fileno() would force one
+    if isinstance(f, tempfile.SpooledTemporaryFile) and getattr(f, "_rolled", False):
+        return f
+    return f.read()
+
+
+def _downcast_low_cardinality(df: pd.DataFrame, max_cardinality: int) -> pd.DataFrame:
+    """Convert repetitive string columns to ``category`` in place.
+
+    Only applied when a request sets ``categorical_downcast_cardinality``, as
+    it changes the dtypes fusion sees and returns. A column qualifies when it
+    has at most ``max_cardinality`` distinct values and fewer than half as
+    many as rows; its values then live once in the
+    categories and the rows become small integer codes, which also feeds the
+    categorical alignment and one-hot encoding in fusion directly.
+    """
+    for col in df.select_dtypes(include=["object", "string"]).columns:
+        n_unique = df[col].nunique()
+        if n_unique < len(df) * 0.5 and n_unique <= max_cardinality:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def _parse_upload(
+    upload: UploadFile, label: str, max_size_mb: int, max_cardinality: Optional[int]
+) -> pd.DataFrame:
+    """Parse an uploaded file as Parquet or CSV, detected by magic number."""
+    source = _upload_source(upload, max_size_mb)
+    if not source:
+        raise HTTPException(status_code=422, detail=f"File {label} is empty")
+    if _detect_file_type(_source_head(source, 4), upload.filename) == "parquet":
+        df = _read_parquet(source)
+    else:
+        df = _read_csv(source)
+    if max_cardinality is None:
+        return df
+    return _downcast_low_cardinality(df, max_cardinality)
+
+
+def _upload_options(
     overlap_features: Optional[List[str]] = None,
     targets_from_a: Optional[List[str]] = None,
     targets_from_b: Optional[List[str]] = None,
@@ -380,47 +735,10 @@ async def fuse_upload(
     row_limit: Optional[int] = None,
     columns_include: Optional[List[str]] = None,
     columns_exclude: Optional[List[str]] = None,
-) -> FuseResponse:
-    settings = APISettings.from_env()
-    max_file_size_mb = settings.max_body_mb
-    
-    # Read and validate file A
-    content_a = await file_a.read()
-    if not content_a:
-        raise HTTPException(status_code=422, detail="File A is empty")
-    _validate_file_size(content_a, max_file_size_mb)
-    
-    # Read and validate file B
-    content_b = await file_b.read()
-    if not content_b:
-        raise HTTPException(status_code=422, detail="File B is empty")
-    _validate_file_size(content_b, max_file_size_mb)
-    
-    # Detect file types using magic numbers
-    file_type_a = _detect_file_type(content_a, file_a.filename)
-    file_type_b = _detect_file_type(content_b, file_b.filename)
-    
-    # Read files based on detected type
-    if file_type_a == "parquet":
-        df_a = _read_parquet(content_a)
-    else:
-        df_a = _read_csv(content_a)
-    
-    if file_type_b == "parquet":
-        df_b = _read_parquet(content_b)
-    else:
-        df_b = _read_csv(content_b)
-    
-    # Validate DataFrames are not empty
-    if df_a.empty:
-        raise HTTPException(status_code=422, detail="Dataset A is empty after parsing")
-    if df_b.empty:
-        raise HTTPException(status_code=422, detail="Dataset B is empty after parsing")
-
-    # Convert to records for reuse of service logic
-    req = FuseRequest(
-        df_a=df_a.to_dict(orient="records"),
-        df_b=df_b.to_dict(orient="records"),
+    categorical_downcast_cardinality: Optional[int] = None,
+) -> FuseOptions:
+    """Fusion options of the upload endpoints, sent next to the files."""
+    return FuseOptions(
         overlap_features=overlap_features,
         targets_from_a=targets_from_a,
         targets_from_b=targets_from_b,
@@ -430,6 +748,67 @@ async def fuse_upload(
         row_limit=row_limit,
         columns_include=columns_include,
         columns_exclude=columns_exclude,
+        categorical_downcast_cardinality=categorical_downcast_cardinality,
+    )
+
+
+async def _parse_uploads(
+    file_a: UploadFile, file_b: UploadFile, options: FuseOptions
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Validate and parse both uploads concurrently off the event loop.
+
+    The Arrow readers release the GIL, so the two parses run in parallel.
+    """
+    # Reject empty files before starting either parse; the multipart parser
+    # already knows each file's size
+    for label, upload in (("A", file_a), ("B", file_b)):
+        if upload.size == 0:
+            raise HTTPException(status_code=422, detail=f"File {label} is empty")
+    max_file_size_mb = get_settings().max_body_mb
+    max_cardinality = options.categorical_downcast_cardinality
+    df_a, df_b = await asyncio.gather(
+        run_in_threadpool(_parse_upload, file_a, "A", max_file_size_mb, max_cardinality),
+        run_in_threadpool(_parse_upload, file_b, "B", max_file_size_mb, max_cardinality),
     )
-    return perform_fusion(req)
+    
+    # Validate DataFrames are not empty
+    if df_a.empty:
+        raise HTTPException(status_code=422, detail="Dataset A is empty after parsing")
+    if df_b.empty:
+        raise HTTPException(status_code=422, detail="Dataset B is empty after parsing")
+    return df_a, df_b
+
 
+@router.post("/fuse/upload", response_model=FuseResponse, response_class=ORJSONResponse)
+async def fuse_upload(
+    request: Request,
+    file_a: UploadFile = File(..., description="CSV or Parquet for dataset A"),
+    file_b: UploadFile = File(..., description="CSV or Parquet for dataset B"),
+    options: FuseOptions = Depends(_upload_options),
+) -> ORJSONResponse:
+    # The parsed frames go to the service as-is; only the options are validated
+    df_a, df_b = await _parse_uploads(file_a, file_b, options)
+    result = await _run_offloaded(request, perform_fusion_df, df_a, df_b, options)
+    return ORJSONResponse(dict(result))
+
+
+@router.post(
+    "/fuse/upload/arrow",
+    response_class=StreamingResponse,
+    responses={200: {"content": {ARROW_STREAM_MEDIA_TYPE: {}}}},
+)
+async def fuse_upload_arrow(
+    request: Request,
+    file_a: UploadFile = File(..., description="CSV or Parquet for dataset A"),
+    file_b: UploadFile = File(..., description="CSV or Parquet for dataset B"),
+    options: FuseOptions = Depends(_upload_options),
+) -> StreamingResponse:
+    """Same as ``/fuse/upload`` but responds like ``/fuse/arrow``.
+
+    Files in, Arrow IPC out: the fused data never passes through JSON.
+    """
+    df_a, df_b = await _parse_uploads(file_a, file_b, options)
+    buffers = await _run_offloaded(request, perform_fusion_arrow_df, df_a, df_b, options)
+    return StreamingResponse(
+        (memoryview(buf) for buf in buffers), media_type=ARROW_STREAM_MEDIA_TYPE
+    )
@@ -1,13 +1,30 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from typing import Annotated, Any, Dict, List, Literal, Optional, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, WithJsonSchema, field_validator
 
 
-class FuseRequest(BaseModel):
-    df_a: List[Dict[str, Any]] = Field(..., description="Rows for dataset A as list of records")
-    df_b: List[Dict[str, Any]] = Field(..., description="Rows for dataset B as list of records")
+# Rows go straight into the DataFrame constructor, so they are only checked to
+# be objects instead of having every cell validated (and copied) by pydantic.
+# A dataset is either a list of row objects or an object of equal-length
+# column arrays; the columnar form skips per-row type inference entirely.
+Records = Annotated[
+    Union[List[Any], Dict[str, List[Any]]],
+    WithJsonSchema(
+        {
+            "oneOf": [
+                {"type": "array", "items": {"type": "object", "additionalProperties": True}},
+                {"type": "object", "additionalProperties": {"type": "array"}},
+            ]
+        }
+    ),
+]
+
+
+class FuseOptions(BaseModel):
+    """Everything a fusion request carries besides the two datasets."""
+
     overlap_features: Optional[List[str]] = Field(
         default=None, description="Optional explicit overlap feature names"
     )
@@ -20,9 +37,14 @@ class FuseRequest(BaseModel):
     prefer_pycaret: Optional[bool] = Field(default=True)
     random_state: Optional[int] = Field(default=42)
     # Advanced config
+    model_family: Optional[Literal["rf", "hgbt", "lgbm"]] = Field(default="rf")
     cv_splits: Optional[int] = Field(default=3)
     n_estimators: Optional[int] = Field(default=300)
+    max_depth: Optional[int] = Field(default=16, ge=1)
+    min_samples_leaf: Optional[int] = Field(default=1, ge=1)
     use_sparse_onehot: Optional[bool] = Field(default=True)
+    categorical_encoding: Optional[Literal["onehot", "ordinal"]] = Field(default="onehot")
+    use_sklearnex: Optional[bool] = Field(default=False)
     max_category_cardinality: Optional[int] = Field(default=100)
     warn_on_high_cardinality: Optional[bool] = Field(default=True)
     # API shaping
@@ -32,6 +54,35 @@ class FuseRequest(BaseModel):
     row_limit: Optional[int] = Field(default=None, ge=0)
     columns_include: Optional[List[str]] = Field(default=None)
     columns_exclude: Optional[List[str]] = Field(default=None)
+    # Upload parsing
+    categorical_downcast_cardinality: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Upload endpoints only: parse string columns with at most this many "
+        "distinct values as categorical; off by default",
+    )
+
+
+class FuseRequest(FuseOptions):
+    df_a: Records = Field(
+        ..., description="Dataset A as list of records or as object of column arrays"
+    )
+    df_b: Records = Field(
+        ..., description="Dataset B as list of records or as object of column arrays"
+    )
+
+    @field_validator("df_a", "df_b")
+    @classmethod
+    def _rows_are_objects(
+        cls, rows: Union[List[Any], Dict[str, List[Any]]]
+    ) -> Union[List[Any], Dict[str, List[Any]]]:
+        if isinstance(rows, dict):
+            if len({len(values) for values in rows.values()}) > 1:
+                raise ValueError("all columns must have the same length")
+            return rows
+        if not all(isinstance(row, dict) for row in rows):
+            raise ValueError("each row must be a JSON object")
+        return rows
 
 
 class FuseResponse(BaseModel):
@@ -1,54 +1,66 @@
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # orjson ships with the API extra; stdlib json is enough here
+    orjson = None  # type: ignore[assignment]
 
-def write_notebook(path: Path, title: str, code_source_lines: list[str]) -> None:
+
+# Identical for every generated notebook
+_NOTEBOOK_METADATA = {
+    "kernelspec": {
+        "display_name": "Python 3",
+        "language": "python",
+        "name": "python3",
+    },
+    "language_info": {
+        "name": "python",
+        "version": "3.11",
+    },
+}
+
+
+def _dump_notebook(notebook: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(notebook, option=orjson.OPT_INDENT_2)
+    return json.dumps(notebook, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def write_notebook(path: Path, title: str, code: str) -> None:
+    # nbformat 4 accepts a cell source as one string, which keeps the JSON compact
     notebook = {
         "cells": [
             {
                 "cell_type": "markdown",
                 "metadata": {},
-                "source": [f"# {title}\n"],
+                "source": f"# {title}\n",
             },
             {
                 "cell_type": "code",
                 "execution_count": None,
                 "metadata": {},
                 "outputs": [],
-                "source": code_source_lines,
+                "source": code.strip("\n") + "\n",
             },
         ],
-        "metadata": {
-            "kernelspec": {
-                "display_name": "Python 3",
-                "language": "python",
-                "name": "python3",
-            },
-            "language_info": {
-                "name": "python",
-                "version": "3.11",
-            },
-        },
+        "metadata": _NOTEBOOK_METADATA,
         "nbformat": 4,
         "nbformat_minor": 5,
     }
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(notebook, f, ensure_ascii=False, indent=2)
-
-
-def to_lines(block: str) -> list[str]:
-    return [line + "\n" for line in block.strip("\n").split("\n")]
+    path.write_bytes(_dump_notebook(notebook))
 
 
 def main() -> None:
     examples_dir = Path("/workspace/examples")
 
-    write_notebook(
+    notebooks: list[tuple[Path, str, str]] = []
+    notebooks.append((
         examples_dir / "intro.ipynb",
         "datafusion-ml Intro",
-        to_lines(
-            """
+        """
 import pandas as pd
 from datafusion_ml import fuse_datasets
 
@@ -67,15 +79,13 @@ B = pd.DataFrame({
 
 res = fuse_datasets(A, B, prefer_pycaret=False)
 res.fused.head()
-            """
-        ),
-    )
+            """,
+    ))
 
-    write_notebook(
+    notebooks.append((
         examples_dir / "breast_cancer.ipynb",
         "Breast Cancer fusion example",
-        to_lines(
-            """
+        """
 from sklearn.datasets import load_breast_cancer
 import numpy as np
 import pandas as pd
@@ -90,22 +100,24 @@ A = df[overlap + ["diagnosis"]].copy()
 rng = np.random.default_rng(42)
 weights = np.array([0.5, 0.2, 0.2, 0.1])
 base = A[overlap].to_numpy() @ weights
-noise = rng.normal(0.0, 0.5, size=base.shape[0])
+# Draw the noise into one buffer, scale and add it in place
+noise = np.empty(base.shape[0])
+rng.standard_normal(out=noise)
+noise *= 0.5
+base += noise
 B = df[overlap].copy()
-B["risk_score"] = base + noise
+B["risk_score"] = base
 
 # Fuse
 a2b = fuse_datasets(A, B)
 a2b.fused.head()
-            """
-        ),
-    )
+            """,
+    ))
 
-    write_notebook(
+    notebooks.append((
         examples_dir / "diabetes.ipynb",
         "Diabetes fusion example",
-        to_lines(
-            """
+        """
 from sklearn.datasets import load_diabetes
 import numpy as np
 import pandas as pd
@@ -123,7 +135,11 @@ A["disease_progression"] = y
 
 # Synthetic classification target in B
 rng = np.random.default_rng(7)
-score = (X[overlap].to_numpy() @ np.array([0.6, 0.2, 0.1, 0.1])) + rng.normal(0, 0.3, size=X.shape[0])
+score = X[overlap].to_numpy() @ np.array([0.6, 0.2, 0.1, 0.1])
+noise = np.empty(score.shape[0])
+rng.standard_normal(out=noise)
+noise *= 0.3
+score += noise
 threshold = np.median(score)
 B = X[overlap].copy()
 B["high_risk"] = (score > threshold).astype(int)
@@ -131,15 +147,13 @@ B["high_risk"] = (score > threshold).astype(int)
 # Fuse
 res = fuse_datasets(A, B, prefer_pycaret=False)
 res.fused.head()
-            """
-        ),
-    )
+            """,
+    ))
 
-    write_notebook(
+    notebooks.append((
         examples_dir / "advanced_custom.ipynb",
         "Advanced: custom overlaps and targets",
-        to_lines(
-            """
+        """
 import pandas as pd
 from datafusion_ml import fuse_datasets
 
@@ -169,9 +183,12 @@ res = fuse_datasets(
 )
 
 res.a_enriched, res.b_enriched
-            """
-        ),
-    )
+            """,
+    ))
+
+    # Each notebook is encoded and written independently
+    with ThreadPoolExecutor(max_workers=len(notebooks)) as pool:
+        list(pool.map(lambda nb: write_notebook(*nb), notebooks))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,43 @@
+"""Read-only test data shared by the API test modules, built once per run."""
+
+import io
+from typing import Any, Dict
+
+import orjson
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+A = pd.DataFrame({
+    "age": [1, 2, 3],
+    "sex": ["m", "f", "m"],
+    "y": [0, 1, 0],
+})
+B = pd.DataFrame({
+    "age": [2, 3, 4],
+    "sex": ["f", "m", "f"],
+    "x": [0.2, 0.3, 0.1],
+})
+
+# JSON request body for /v1/fuse and /v1/fuse/async; copy before changing keys
+BASE_PAYLOAD: Dict[str, Any] = {
+    "df_a": A.to_dict(orient="records"),
+    "df_b": B.to_dict(orient="records"),
+    "prefer_pycaret": False,
+}
+BASE_PAYLOAD_JSON = orjson.dumps(BASE_PAYLOAD)
+JSON_HEADERS = {"content-type": "application/json"}
+
+A_CSV = A.to_csv(index=False).encode()
+B_CSV = B.to_csv(index=False).encode()
+
+
+def _parquet_bytes(df: pd.DataFrame) -> bytes:
+    buf = io.BytesIO()
+    pq.write_table(pa.Table.from_pandas(df), buf)
+    return buf.getvalue()
+
+
+A_PARQUET = _parquet_bytes(A)
+B_PARQUET = _parquet_bytes(B)
@@ -0,0 +1,37 @@
+import pytest
+
+from datafusion_ml.web.config import get_settings
+
+
+@pytest.fixture(autouse=True)
+def _fresh_settings():
+    # Settings are cached per process; tests tweak DFML_* via monkeypatch
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+@pytest.fixture(scope="session")
+def client():
+    # Importing the app builds every route and schema; do it once per run
+    from fastapi.testclient import TestClient
+
+    from datafusion_ml.api import app
+
+    return TestClient(app)
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def aclient():
+    # In-process ASGI transport on the test's own event loop: no portal thread
+    import httpx
+
+    from datafusion_ml.api import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as c:
+        yield c
@@ -2,30 +2,27 @@ import json
 from typing import Any, Dict
 
 import pandas as pd
-from fastapi.testclient import TestClient
+import pyarrow as pa
 
-from datafusion_ml.api import app
+from _shared import A, B, BASE_PAYLOAD, BASE_PAYLOAD_JSON, JSON_HEADERS
 
 
-client = TestClient(app)
+def _ipc_body(*frames: pd.DataFrame) -> bytes:
+    """Encode frames as back-to-back Arrow IPC streams, columnar end to end."""
+    sink = pa.BufferOutputStream()
+    for df in frames:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+_IPC_BODY = _ipc_body(A, B)
 
 
 def _payload(return_parts=None, row_limit=None, columns_include=None, columns_exclude=None) -> Dict[str, Any]:
-    A = pd.DataFrame({
-        "age": [1, 2, 3],
-        "sex": ["m", "f", "m"],
-        "y": [0, 1, 0],
-    })
-    B = pd.DataFrame({
-        "age": [2, 3, 4],
-        "sex": ["f", "m", "f"],
-        "x": [0.2, 0.3, 0.1],
-    })
-    body: Dict[str, Any] = {
-        "df_a": A.to_dict(orient="records"),
-        "df_b": B.to_dict(orient="records"),
-        "prefer_pycaret": False,
-    }
+    # Shallow copy: tests only replace top-level keys, never the shared records
+    body = BASE_PAYLOAD.copy()
     if return_parts is not None:
         body["return_parts"] = return_parts
     if row_limit is not None:
@@ -37,20 +34,20 @@ def _payload(return_parts=None, row_limit=None, columns_include=None, columns_ex
     return body
 
 
-def test_health():
+def test_health(client):
     r = client.get("/v1/health")
     assert r.status_code == 200
     assert r.json()["status"] == "ok"
 
 
-def test_fuse_default():
-    r = client.post("/v1/fuse", json=_payload())
+def test_fuse_default(client):
+    r = client.post("/v1/fuse", content=BASE_PAYLOAD_JSON, headers=JSON_HEADERS)
     assert r.status_code == 200, r.text
     data = r.json()
     assert "fused" in data and isinstance(data["fused"], list)
 
 
-def test_fuse_limits_and_parts():
+def test_fuse_limits_and_parts(client):
     r = client.post("/v1/fuse", json=_payload(return_parts=["fused"], row_limit=2, columns_include=["age"]))
     assert r.status_code == 200
     data = r.json()
@@ -61,10 +58,74 @@ def test_fuse_limits_and_parts():
     assert set(data["fused"][0].keys()) == {"age"}
 
 
-def test_fuse_no_overlap_error():
+def test_fuse_no_overlap_error(client):
     body = {
         "df_a": [{"a": 1, "y": 0}],
         "df_b": [{"b": 2, "x": 0.1}],
     }
     r = client.post("/v1/fuse", json=body)
     assert r.status_code == 400
+
+
+def test_fuse_rejects_non_object_rows(client):
+    body = {"df_a": [1, 2], "df_b": [{"b": 2, "x": 0.1}]}
+    r = client.post("/v1/fuse", json=body)
+    assert r.status_code == 422
+
+
+def test_fuse_accepts_columnar_payload(client):
+    body = _payload(return_parts=["fused"])
+    body["df_a"] = pd.DataFrame(body["df_a"]).to_dict(orient="list")
+    r = client.post("/v1/fuse", json=body)
+    assert r.status_code == 200, r.text
+    assert len(r.json()["fused"]) == 6
+
+    body["df_a"] = {"age": [1, 2], "y": [0]}
+    assert client.post("/v1/fuse", json=body).status_code == 422
+
+
+def test_fuse_arrow_stream(client):
+    r = client.post("/v1/fuse/arrow", json=_payload(return_parts=["fused", "metrics"]))
+    assert r.status_code == 200, r.text
+    assert r.headers["content-type"] == "application/vnd.apache.arrow.stream"
+
+    source = pa.BufferReader(r.content)
+    tables = {}
+    while source.tell() < source.size():
+        table = pa.ipc.open_stream(source).read_all()
+        tables[table.schema.metadata[b"datafusion.part"].decode()] = table
+    assert set(tables) == {"fused", "metrics"}
+    assert tables["fused"].num_rows == 6
+    assert tables["metrics"].column_names == ["direction", "target", "metric", "value"]
+
+
+def test_fuse_ipc_roundtrip(client):
+    r = client.post(
+        "/v1/fuse/ipc",
+        params={"prefer_pycaret": False, "return_parts": ["fused", "metrics"]},
+        content=_IPC_BODY,
+        headers={"content-type": "application/vnd.apache.arrow.stream"},
+    )
+    assert r.status_code == 200, r.text
+    source = pa.BufferReader(r.content)
+    parts = []
+    while source.tell() < source.size():
+        parts.append(pa.ipc.open_stream(source).read_all().schema.metadata[b"datafusion.part"])
+    assert parts == [b"fused", b"metrics"]
+
+    bad = client.post("/v1/fuse/ipc", content=b"not arrow")
+    assert bad.status_code == 422
+
+
+def test_fuse_ipc_matches_json(client):
+    """Arrow IPC input gives the same fused rows as the JSON records payload."""
+    json_fused = client.post("/v1/fuse", json=_payload(return_parts=["fused"])).json()["fused"]
+    r = client.post(
+        "/v1/fuse/ipc",
+        params={"prefer_pycaret": False, "return_parts": ["fused"]},
+        content=_IPC_BODY,
+        headers={"content-type": "application/vnd.apache.arrow.stream"},
+    )
+    assert r.status_code == 200, r.text
+    ipc_fused = pa.ipc.open_stream(pa.BufferReader(r.content)).read_all().to_pylist()
+    assert ipc_fused == json_fused
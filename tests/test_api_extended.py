@@ -1,114 +1,310 @@
-import io
 import os
 import time
 from typing import Any, Dict
 
-import pandas as pd
 import pyarrow as pa
-import pyarrow.parquet as pq
+import pytest
 from fastapi.testclient import TestClient
 
-from datafusion_ml.api import app
+from _shared import A_CSV, A_PARQUET, B_CSV, B_PARQUET, BASE_PAYLOAD, BASE_PAYLOAD_JSON, JSON_HEADERS
 
 
-client = TestClient(app)
+def _payload_small() -> Dict[str, Any]:
+    return dict(BASE_PAYLOAD)
 
 
-def _payload_small() -> Dict[str, Any]:
-    A = pd.DataFrame({
-        "age": [1, 2, 3],
-        "sex": ["m", "f", "m"],
-        "y": [0, 1, 0],
-    })
-    B = pd.DataFrame({
-        "age": [2, 3, 4],
-        "sex": ["f", "m", "f"],
-        "x": [0.2, 0.3, 0.1],
-    })
-    return {
-        "df_a": A.to_dict(orient="records"),
-        "df_b": B.to_dict(orient="records"),
-        "prefer_pycaret": False,
-    }
+def _await_job(c: TestClient, job_id: str, timeout: float = 30.0) -> Dict[str, Any]:
+    """Long-poll a job until it leaves ``pending`` or ``timeout`` seconds pass."""
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        s = c.get(f"/v1/fuse/async/{job_id}", params={"wait": min(max(remaining, 0), 30)})
+        assert s.status_code == 200, s.text
+        body = s.json()
+        if body.get("status") != "pending":
+            return body
+        if remaining <= 0:
+            raise AssertionError(f"async job {job_id} did not finish within {timeout}s")
 
 
-def test_metrics_endpoint():
+def test_metrics_endpoint(client):
     r = client.get("/metrics")
     assert r.status_code == 200
     assert "text/plain" in r.headers.get("content-type", "")
 
 
-def test_file_upload_csv():
-    A = pd.DataFrame({
-        "age": [1, 2, 3],
-        "sex": ["m", "f", "m"],
-        "y": [0, 1, 0],
-    })
-    B = pd.DataFrame({
-        "age": [2, 3, 4],
-        "sex": ["f", "m", "f"],
-        "x": [0.2, 0.3, 0.1],
-    })
-    a_buf = io.BytesIO()
-    b_buf = io.BytesIO()
-    A.to_csv(a_buf, index=False)
-    B.to_csv(b_buf, index=False)
+@pytest.mark.parametrize(
+    "name_a, name_b, content_a, content_b, mime",
+    [
+        ("a.csv", "b.csv", A_CSV, B_CSV, "text/csv"),
+        ("a.parquet", "b.parquet", A_PARQUET, B_PARQUET, "application/octet-stream"),
+        # Parquet named .csv: the magic number, not the name, picks the reader
+        ("a.csv", "b.csv", A_PARQUET, B_PARQUET, "application/octet-stream"),
+    ],
+    ids=["csv", "parquet", "parquet-named-csv"],
+)
+def test_file_upload(client, name_a, name_b, content_a, content_b, mime):
     files = {
-        "file_a": ("a.csv", a_buf.getvalue(), "text/csv"),
-        "file_b": ("b.csv", b_buf.getvalue(), "text/csv"),
+        "file_a": (name_a, content_a, mime),
+        "file_b": (name_b, content_b, mime),
     }
     r = client.post("/v1/fuse/upload", files=files)
-    assert r.status_code == 200
+    assert r.status_code == 200, r.text
     data = r.json()
     assert "fused" in data and isinstance(data["fused"], list)
 
-
-def test_file_upload_parquet():
-    A = pd.DataFrame({
-        "age": [1, 2, 3],
-        "sex": ["m", "f", "m"],
-        "y": [0, 1, 0],
-    })
-    B = pd.DataFrame({
-        "age": [2, 3, 4],
-        "sex": ["f", "m", "f"],
-        "x": [0.2, 0.3, 0.1],
-    })
-    a_buf = io.BytesIO()
-    b_buf = io.BytesIO()
-    pq.write_table(pa.Table.from_pandas(A), a_buf)
-    pq.write_table(pa.Table.from_pandas(B), b_buf)
-    files = {
-        "file_a": ("a.parquet", a_buf.getvalue(), "application/octet-stream"),
-        "file_b": ("b.parquet", b_buf.getvalue(), "application/octet-stream"),
-    }
-    r = client.post("/v1/fuse/upload", files=files)
-    assert r.status_code == 200
-    data = r.json()
-    assert "fused" in data and isinstance(data["fused"], list)
+    r = client.post("/v1/fuse/upload/arrow", files=files)
+    assert r.status_code == 200, r.text
+    assert r.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    fused = pa.ipc.open_stream(pa.BufferReader(r.content)).read_all()
+    assert fused.schema.metadata[b"datafusion.part"] == b"fused"
+    assert fused.num_rows == len(data["fused"])
 
 
-def test_async_processing():
-    r = client.post("/v1/fuse/async", json=_payload_small())
+@pytest.mark.anyio
+async def test_async_processing(aclient):
+    r = await aclient.post("/v1/fuse/async", content=BASE_PAYLOAD_JSON, headers=JSON_HEADERS)
     assert r.status_code == 200
     job_id = r.json()["job_id"]
-    # Poll for completion
-    for _ in range(50):
-        s = client.get(f"/v1/fuse/async/{job_id}")
-        assert s.status_code == 200
-        body = s.json()
-        if body.get("status") == "done":
-            assert "result" in body
-            assert "fused" in body["result"]
-            break
-        time.sleep(0.05)
-    else:
-        assert False, "async job did not complete in time"
+    # The long poll waits on the event loop, not on a worker thread
+    s = await aclient.get(f"/v1/fuse/async/{job_id}", params={"wait": 30})
+    assert s.status_code == 200
+    body = s.json()
+    assert body.get("status") == "done", body
+    assert "result" in body
+    assert "fused" in body["result"]
+
+    assert (await aclient.get(f"/v1/fuse/async/{job_id}", params={"wait": 60})).status_code == 422
+
+
+def test_async_status_wait_times_out_on_pending_job(client):
+    from datafusion_ml.web.routers import fusion
+
+    fusion._put_job("pending-job", {"status": "pending"}, time.time())
+    started = time.perf_counter()
+    s = client.get("/v1/fuse/async/pending-job", params={"wait": 0.2})
+    assert s.json() == {"status": "pending"}
+    assert time.perf_counter() - started >= 0.2
+    assert "pending-job" not in fusion._job_shard("pending-job").waiters
+
+
+def test_fuse_process_pool(monkeypatch):
+    from datafusion_ml.web.app import create_app
+
+    monkeypatch.setenv("DFML_FUSION_WORKERS", "1")
+    pooled_app = create_app()
+    with TestClient(pooled_app) as pooled:
+        assert pooled_app.state.fusion_pool is not None
+        r = pooled.post("/v1/fuse", content=BASE_PAYLOAD_JSON, headers=JSON_HEADERS)
+        job_id = pooled.post("/v1/fuse/async", content=BASE_PAYLOAD_JSON, headers=JSON_HEADERS).json()["job_id"]
+        status = _await_job(pooled, job_id)
+    assert r.status_code == 200, r.text
+    assert len(r.json()["fused"]) == 6
+    assert status["status"] == "done", status
+    assert len(status["result"]["fused"]) == 6
 
 
-def test_row_limit_exceeds_max(monkeypatch):
+def test_row_limit_exceeds_max(client, monkeypatch):
     monkeypatch.setenv("DFML_MAX_ROWS", "1")
     body = _payload_small()
     body["row_limit"] = 10
     r = client.post("/v1/fuse", json=body)
     assert r.status_code == 413
+
+
+def test_body_size_limit(monkeypatch):
+    from datafusion_ml.web.app import create_app
+
+    monkeypatch.setenv("DFML_MAX_BODY_MB", "1")
+    limited = TestClient(create_app())
+    oversized = b"x" * (1024 * 1024 + 1)
+
+    r = limited.post("/v1/fuse", content=oversized, headers={"content-type": "application/json"})
+    assert r.status_code == 413
+
+    # Without Content-Length the body is counted while it streams in
+    chunks = (oversized[i:i + 65536] for i in range(0, len(oversized), 65536))
+    r = limited.post("/v1/fuse", content=chunks, headers={"content-type": "application/json"})
+    assert r.status_code == 413
+
+    # Only form uploads are left to the upload routes' own checks
+    r = limited.post("/v1/fuse", content=oversized, headers={"content-type": "multipart/mixed; boundary=x"})
+    assert r.status_code == 413
+
+
+def test_rate_limit_and_jwt_middlewares(monkeypatch):
+    from datafusion_ml.web.app import create_app
+
+    jwt = pytest.importorskip("jwt")
+
+    monkeypatch.setenv("DFML_RATE_LIMIT_ENABLED", "true")
+    monkeypatch.setenv("DFML_RATE_LIMIT_PER_MINUTE", "1")
+    monkeypatch.setenv("DFML_JWT_ENABLED", "true")
+    monkeypatch.setenv("DFML_JWT_SECRET", "test-secret")
+    secured = TestClient(create_app())
+
+    assert secured.get("/v1/health").status_code == 200
+    r = secured.get("/v1/fuse/async/unknown")
+    assert r.status_code == 401
+    assert r.headers["www-authenticate"] == "Bearer"
+
+    token = jwt.encode({"sub": "tester"}, "test-secret", algorithm="HS256")
+    auth = {"Authorization": f"Bearer {token}"}
+    assert secured.get("/v1/fuse/async/unknown", headers=auth).status_code == 404
+    # Second authenticated request within the minute
+    assert secured.get("/v1/fuse/async/unknown", headers=auth).status_code == 429
+
+
+def test_rate_limiter_token_bucket(monkeypatch):
+    from datafusion_ml.web import middleware
+
+    now = [1000.0]
+    monkeypatch.setattr(middleware.time, "monotonic", lambda: now[0])
+    limiter = middleware.RateLimiter(requests_per_minute=2)
+
+    assert [limiter.is_allowed("a") for _ in range(3)] == [True, True, False]
+    assert limiter.is_allowed("b")
+    # One token refills every 30 seconds at 2 requests per minute
+    now[0] += 30
+    assert limiter.is_allowed("a")
+    assert not limiter.is_allowed("a")
+
+
+def test_rate_limiter_evicts_least_recent_client():
+    from datafusion_ml.web.middleware import RateLimiter
+
+    limiter = RateLimiter(requests_per_minute=1, max_clients=2)
+    assert limiter.is_allowed("a") and limiter.is_allowed("b")
+    assert not limiter.is_allowed("a")  # refreshes "a"
+    assert limiter.is_allowed("c")  # evicts "b"
+    assert list(limiter.buckets) == ["a", "c"]
+
+
+def test_metrics_output_is_cached(monkeypatch):
+    from datafusion_ml.web import app as app_module
+    from datafusion_ml.web.config import get_settings
+
+    calls = []
+
+    def fake_generate_latest() -> bytes:
+        calls.append(1)
+        return b"# rendered %d\n" % len(calls)
+
+    monkeypatch.setattr(app_module, "generate_latest", fake_generate_latest)
+    monkeypatch.setenv("DFML_METRICS_CACHE_TTL_S", "60")
+    cached = TestClient(app_module.create_app())
+    assert cached.get("/metrics").text == cached.get("/metrics").text
+    assert len(calls) == 1
+
+    monkeypatch.setenv("DFML_METRICS_CACHE_TTL_S", "0")
+    get_settings.cache_clear()
+    uncached = TestClient(app_module.create_app())
+    assert uncached.get("/metrics").text != uncached.get("/metrics").text
+
+
+def test_client_ip_prefers_proxy_headers():
+    from datafusion_ml.web.middleware import _client_ip
+
+    peer = {"client": ("10.0.0.9", 1234)}
+    assert _client_ip({**peer, "headers": [(b"x-forwarded-for", b" 1.2.3.4 , 5.6.7.8")]}) == "1.2.3.4"
+    assert _client_ip({**peer, "headers": [(b"x-real-ip", b"9.9.9.9")]}) == "9.9.9.9"
+    assert _client_ip({**peer, "headers": []}) == "10.0.0.9"
+    assert _client_ip({"headers": []}) == "unknown"
+
+
+def test_jwt_without_pyjwt_fails_at_startup(monkeypatch):
+    from datafusion_ml.web import middleware
+    from datafusion_ml.web.config import APISettings
+
+    monkeypatch.setattr(middleware, "_HAS_JWT", False)
+    monkeypatch.setenv("DFML_JWT_ENABLED", "true")
+    monkeypatch.setenv("DFML_JWT_SECRET", "test-secret")
+    with pytest.raises(ValueError, match="PyJWT"):
+        APISettings()
+
+
+def test_jwt_cache_skips_repeated_decode(monkeypatch):
+    from datafusion_ml.web import middleware
+
+    jwt = pytest.importorskip("jwt")
+    decoded = []
+    real_decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        decoded.append(1)
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(middleware.jwt, "decode", counting_decode)
+    auth = middleware.JWTAuthMiddleware(app=None, jwt_secret="s")
+    token = jwt.encode({"sub": "a", "exp": int(time.time()) + 60}, "s", algorithm="HS256")
+    assert auth._decode(token) == auth._decode(token)
+    assert len(decoded) == 1
+
+    # A handler mutating its payload does not leak into later requests
+    auth._decode(token)["sub"] = "mutated"
+    assert auth._decode(token)["sub"] == "a"
+
+    expired = jwt.encode({"sub": "a", "exp": int(time.time()) - 1}, "s", algorithm="HS256")
+    with pytest.raises(jwt.ExpiredSignatureError):
+        auth._decode(expired)
+    assert len(auth._cache) == 1
+
+
+def test_body_size_limit_stops_reading_oversized_stream():
+    import asyncio
+    from datafusion_ml.web.middleware import BodySizeLimitMiddleware
+
+    pulled = []
+    sent = []
+
+    async def receive():
+        pulled.append(1)
+        return {"type": "http.request", "body": b"x" * 10, "more_body": True}
+
+    async def send(message):
+        sent.append(message)
+
+    async def app(scope, receive, send):
+        # Reads until the middleware reports a disconnect, then tries to answer
+        while (await receive())["type"] == "http.request":
+            pass
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    limited = BodySizeLimitMiddleware(app, max_bytes=25)
+    asyncio.run(limited({"type": "http", "headers": []}, receive, send))
+    assert len(pulled) == 3
+    assert [m.get("status") for m in sent if m["type"] == "http.response.start"] == [413]
+
+
+def test_request_metrics_use_route_templates(monkeypatch):
+    from datafusion_ml.web.app import create_app
+
+    monkeypatch.setenv("DFML_METRICS_CACHE_TTL_S", "0")
+    instrumented = TestClient(create_app())
+    instrumented.get("/v1/fuse/async/some-job-id")
+    text = instrumented.get("/metrics").text
+    assert 'route="/v1/fuse/async/{job_id}"' in text
+    assert "some-job-id" not in text
+
+
+def test_setup_logging_runs_once_per_config(monkeypatch):
+    import logging
+    from datafusion_ml.web import app as app_module
+    from datafusion_ml.web.config import APISettings
+
+    monkeypatch.setattr(app_module, "_LOGGING_CONFIG", None)
+    app_module._setup_logging(APISettings(log_format="plain"))
+    handler = logging.getLogger().handlers[-1]
+    app_module._setup_logging(APISettings(log_format="plain"))
+    assert logging.getLogger().handlers[-1] is handler
+    app_module._setup_logging(APISettings(log_format="json"))
+    assert logging.getLogger().handlers[-1] is not handler
+
+
+def test_settings_reject_wildcard_cors_with_credentials(monkeypatch):
+    from datafusion_ml.web.config import APISettings
+
+    monkeypatch.setenv("DFML_CORS_ORIGINS", '["*"]')
+    monkeypatch.setenv("DFML_CORS_ALLOW_CREDENTIALS", "true")
+    with pytest.raises(ValueError, match="allow_credentials"):
+        APISettings()
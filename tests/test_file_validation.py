@@ -3,75 +3,45 @@
 import io
 from typing import Any, Dict
 
+import numpy as np
 import pandas as pd
-import pyarrow as pa
-import pyarrow.parquet as pq
-from fastapi.testclient import TestClient
 
-from datafusion_ml.api import app
+from _shared import B_CSV, BASE_PAYLOAD
 
 
-client = TestClient(app)
-
-
-def test_file_upload_with_magic_number_detection():
-    """Test that file type is detected using magic numbers, not just filename."""
-    A = pd.DataFrame({
-        "age": [1, 2, 3],
-        "sex": ["m", "f", "m"],
-        "y": [0, 1, 0],
-    })
-    B = pd.DataFrame({
-        "age": [2, 3, 4],
-        "sex": ["f", "m", "f"],
-        "x": [0.2, 0.3, 0.1],
-    })
-    
-    # Create parquet files but name them as .csv
-    # This tests that magic number detection works
-    a_buf = io.BytesIO()
-    b_buf = io.BytesIO()
-    pq.write_table(pa.Table.from_pandas(A), a_buf)
-    pq.write_table(pa.Table.from_pandas(B), b_buf)
-    
+def test_file_upload_empty_file(client):
+    """Test that empty files are rejected."""
     files = {
-        "file_a": ("a.csv", a_buf.getvalue(), "application/octet-stream"),  # Named .csv but is parquet
-        "file_b": ("b.csv", b_buf.getvalue(), "application/octet-stream"),  # Named .csv but is parquet
+        "file_a": ("a.csv", b"", "text/csv"),
+        "file_b": ("b.csv", b"", "text/csv"),
     }
     r = client.post("/v1/fuse/upload", files=files)
-    # Should still work because magic number detection identifies it as parquet
-    assert r.status_code == 200
-    data = r.json()
-    assert "fused" in data and isinstance(data["fused"], list)
+    assert r.status_code == 422
+    assert "empty" in r.json()["detail"].lower()
 
 
-def test_file_upload_empty_file():
-    """Test that empty files are rejected."""
+def test_empty_upload_is_rejected_before_parsing(client, monkeypatch):
+    """An empty file fails fast, without parsing the other upload."""
+    from datafusion_ml.web.routers import fusion
+
+    def _no_parse(*args, **kwargs):
+        raise AssertionError("uploads should not be parsed")
+
+    monkeypatch.setattr(fusion, "_parse_upload", _no_parse)
     files = {
         "file_a": ("a.csv", b"", "text/csv"),
-        "file_b": ("b.csv", b"", "text/csv"),
+        "file_b": ("b.csv", b"age,x\n1,0.5\n", "text/csv"),
     }
     r = client.post("/v1/fuse/upload", files=files)
     assert r.status_code == 422
-    assert "empty" in r.json()["detail"].lower()
+    assert r.json()["detail"] == "File A is empty"
 
 
-def test_async_job_cleanup():
+def test_async_job_cleanup(client):
     """Test that async jobs are properly tracked and can be cleaned up."""
-    A = pd.DataFrame({
-        "age": [1, 2, 3],
-        "sex": ["m", "f", "m"],
-        "y": [0, 1, 0],
-    })
-    B = pd.DataFrame({
-        "age": [2, 3, 4],
-        "sex": ["f", "m", "f"],
-        "x": [0.2, 0.3, 0.1],
-    })
-    
     payload: Dict[str, Any] = {
-        "df_a": A.to_dict(orient="records"),
-        "df_b": B.to_dict(orient="records"),
+        "df_a": BASE_PAYLOAD["df_a"],
+        "df_b": BASE_PAYLOAD["df_b"],
         "prefer_pycaret": False,
     }
     
@@ -84,3 +54,152 @@ def test_async_job_cleanup():
     s = client.get(f"/v1/fuse/async/{job_id}")
     assert s.status_code == 200
     assert s.json()["status"] in ["pending", "done", "error"]
+
+
+def test_read_csv_matches_pandas():
+    """The Arrow CSV path yields the same frame as pandas, including blanks and dates."""
+    from datafusion_ml.web.routers.fusion import _read_csv
+
+    data = b"a,b,c,d\n1,x,2024-01-01,1.5\n2,,2024-01-02T10:00:00,\n"
+    expected = pd.read_csv(io.BytesIO(data))
+    pd.testing.assert_frame_equal(_read_csv(data), expected)
+    # Ragged rows fall back to pandas
+    ragged = b"a,b\n1,2\n3\n"
+    pd.testing.assert_frame_equal(_read_csv(ragged), pd.read_csv(io.BytesIO(ragged)))
+    # So do duplicate headers and integers beyond int64
+    for data in (b"x,y,y\n1,2,3\n", b"x,y\n1,99999999999999999999\n2,3\n"):
+        pd.testing.assert_frame_equal(_read_csv(data), pd.read_csv(io.BytesIO(data)))
+
+
+def test_upload_with_duplicate_headers_is_fused(client):
+    """A repeated header is renamed as by pandas rather than kept twice."""
+    files = {
+        "file_a": ("a.csv", b"age,sex,sex,y\n1,m,m,0\n2,f,f,1\n3,m,m,0\n", "text/csv"),
+        "file_b": ("b.csv", B_CSV, "text/csv"),
+    }
+    r = client.post("/v1/fuse/upload", files=files)
+    assert r.status_code == 200
+
+
+def test_upload_that_is_not_utf8_is_rejected(client):
+    """Latin-1 bytes give an encoding error, not binary columns."""
+    files = {
+        "file_a": ("a.csv", "age,sex,y\n1,m,0\n2,f\xe9,1\n3,m,0\n".encode("latin-1"), "text/csv"),
+        "file_b": ("b.csv", B_CSV, "text/csv"),
+    }
+    r = client.post("/v1/fuse/upload", files=files)
+    assert r.status_code == 422
+    assert "utf-8" in r.json()["detail"]
+
+
+def test_cleanup_removes_expired_jobs():
+    """Expired jobs are dropped by the sweep or lazily when looked up."""
+    import time
+
+    from datafusion_ml.web.routers import fusion
+
+    expired = time.time() - fusion.JOB_TTL_SECONDS - 1
+    fusion._put_job("old-job", {"status": "done"}, expired)
+    fusion._put_job("refreshed-job", {"status": "pending"}, expired)
+    # The update supersedes the job's first expiry entry
+    fusion._put_job("refreshed-job", {"status": "done"}, time.time())
+    fusion._cleanup_old_jobs()
+    assert "old-job" not in fusion._job_shard("old-job").jobs
+    assert fusion._get_job("refreshed-job") == {"status": "done"}
+
+    fusion._put_job("stale-job", {"status": "done"}, expired)
+    assert fusion._get_job("stale-job") is None
+    assert "stale-job" not in fusion._job_shard("stale-job").jobs
+
+
+def test_parquet_filename_without_magic_number_is_rejected(client):
+    """A .parquet name alone does not route a file to the Parquet reader."""
+    files = {
+        "file_a": ("a.parquet", b"age,y\n1,0\n", "application/octet-stream"),
+        "file_b": ("b.csv", b"age,x\n1,0.5\n", "text/csv"),
+    }
+    r = client.post("/v1/fuse/upload", files=files)
+    assert r.status_code == 422
+    assert "magic number" in r.json()["detail"]
+
+
+def test_upload_spooled_to_disk_is_parsed_in_place():
+    """Uploads that rolled over to disk are parsed from the spooled file itself."""
+    import tempfile
+
+    from fastapi import UploadFile
+
+    from datafusion_ml.web.routers.fusion import _parse_upload, _upload_source
+
+    data = b"age,y\n" + b"".join(b"%d,%d\n" % (i, i % 2) for i in range(100))
+    with tempfile.SpooledTemporaryFile(max_size=64) as spooled:
+        spooled.write(data)
+        upload = UploadFile(file=spooled, filename="a.csv")
+
+        assert _upload_source(upload, max_size_mb=1) is spooled
+        pd.testing.assert_frame_equal(_parse_upload(upload, "A", 1, None), pd.read_csv(io.BytesIO(data)))
+        # A second parse (as for the pandas fallback) starts from the top again
+        pd.testing.assert_frame_equal(_parse_upload(upload, "A", 1, None), pd.read_csv(io.BytesIO(data)))
+
+        expected = pd.DataFrame({"age": np.arange(1000, dtype="int64"), "score": np.linspace(0, 1, 1000)})
+        spooled.seek(0)
+        spooled.truncate()
+        expected.to_parquet(spooled, index=False)
+        upload = UploadFile(file=spooled, filename="a.parquet")
+        pd.testing.assert_frame_equal(_parse_upload(upload, "A", 1, None), expected)
+
+
+def test_upload_without_rollover_support_is_read_into_memory():
+    """File objects other than SpooledTemporaryFile are read into bytes."""
+    from fastapi import UploadFile
+
+    from datafusion_ml.web.routers.fusion import _upload_source
+
+    data = b"age,y\n1,0\n"
+    assert _upload_source(UploadFile(file=io.BytesIO(data), filename="a.csv"), max_size_mb=1) == data
+
+
+def test_low_cardinality_strings_become_categorical():
+    """Repetitive string columns are downcast; near-unique ones are left alone."""
+    from datafusion_ml.web.routers.fusion import _downcast_low_cardinality
+
+    df = pd.DataFrame({
+        "sex": ["m", "f"] * 10,
+        "id": [f"id{i}" for i in range(20)],
+        "age": range(20),
+    })
+    out = _downcast_low_cardinality(df, max_cardinality=100)
+    assert isinstance(out["sex"].dtype, pd.CategoricalDtype)
+    assert not isinstance(out["id"].dtype, pd.CategoricalDtype)
+    assert out["age"].dtype == "int64"
+    # The cardinality cap applies as well
+    capped = _downcast_low_cardinality(pd.DataFrame({"sex": ["m", "f"] * 10}), max_cardinality=1)
+    assert not isinstance(capped["sex"].dtype, pd.CategoricalDtype)
+
+
+def test_uploads_keep_string_dtypes_by_default():
+    """Without categorical_downcast_cardinality uploads parse as pandas would."""
+    from fastapi import UploadFile
+
+    from datafusion_ml.web.routers.fusion import _parse_upload, _upload_options
+
+    data = b"sex,y\n" + b"m,0\nf,1\n" * 10
+    limit = _upload_options().categorical_downcast_cardinality
+    df = _parse_upload(UploadFile(file=io.BytesIO(data), filename="a.csv"), "A", 1, limit)
+    pd.testing.assert_frame_equal(df, pd.read_csv(io.BytesIO(data)))
+    df = _parse_upload(UploadFile(file=io.BytesIO(data), filename="a.csv"), "A", 1, 10)
+    assert isinstance(df["sex"].dtype, pd.CategoricalDtype)
+
+
+def test_excel_magic_numbers_are_rejected():
+    """Both .xlsx (ZIP) and legacy .xls (OLE2) headers are rejected by content."""
+    import pytest
+    from fastapi import HTTPException
+
+    from datafusion_ml.web.routers.fusion import _detect_file_type
+
+    assert _detect_file_type(b"PAR1", "data.bin") == "parquet"
+    for head in (b"PK\x03\x04", b"\xd0\xcf\x11\xe0"):
+        with pytest.raises(HTTPException) as exc:
+            _detect_file_type(head, "data.csv")
+        assert exc.value.status_code == 422
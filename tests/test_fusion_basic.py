@@ -1,10 +1,15 @@
+from typing import List
+
 import pandas as pd
+import pytest
 
 from datafusion_ml.fusion import fuse_datasets
 from datafusion_ml.config import FusionConfig
 
 
-def test_basic_fusion_runs():
+@pytest.fixture(scope="module")
+def fused_with_cfg():
+    # Fitted once and shared by the assertion-only tests below
     A = pd.DataFrame(
         {
             "age_group": ["18-29", "30-44", "45-59", "60+"],
@@ -23,28 +28,238 @@ def test_basic_fusion_runs():
     )
 
     cfg = FusionConfig(prefer_pycaret=False, use_sparse_onehot=True, cv_splits=2, n_estimators=50)
-    result = fuse_datasets(df_a=A, df_b=B, prefer_pycaret=cfg.prefer_pycaret, random_state=cfg.random_state, config=cfg)
+    return fuse_datasets(df_a=A, df_b=B, prefer_pycaret=cfg.prefer_pycaret, random_state=cfg.random_state, config=cfg)
+
 
+def test_basic_fusion_runs(fused_with_cfg):
+    result = fused_with_cfg
     assert result.fused.shape[0] == 8
     assert "target_only_in_A" in result.b_enriched.columns
     assert "numeric_only_in_B" in result.a_enriched.columns
-    assert set(result.metrics_a_to_b.keys()) == {"target_only_in_A"}
-    assert set(result.metrics_b_to_a.keys()) == {"numeric_only_in_B"}
+
+
+def test_basic_fusion_metrics(fused_with_cfg):
+    assert set(fused_with_cfg.metrics_a_to_b.keys()) == {"target_only_in_A"}
+    assert set(fused_with_cfg.metrics_b_to_a.keys()) == {"numeric_only_in_B"}
+
+
+def test_parallel_targets_match_sequential():
+    A = pd.DataFrame(
+        {
+            "age": [1, 2, 3, 4, 5, 6],
+            "sex": ["m", "f", "m", "f", "m", "f"],
+            "y1": [0, 1, 0, 1, 0, 1],
+            "y2": [1.0, 2.5, 3.1, 0.4, 2.2, 1.7],
+        }
+    )
+    B = pd.DataFrame({"age": [2, 3, 4], "sex": ["f", "m", "f"], "x": [0.2, 0.3, 0.1]})
+
+    seq = fuse_datasets(df_a=A, df_b=B, config=FusionConfig(prefer_pycaret=False, cv_splits=2, n_estimators=10))
+    par = fuse_datasets(
+        df_a=A, df_b=B, config=FusionConfig(prefer_pycaret=False, cv_splits=2, n_estimators=10, n_jobs=2)
+    )
+
+    pd.testing.assert_frame_equal(seq.b_enriched, par.b_enriched)
+    assert seq.metrics_a_to_b == par.metrics_a_to_b
+
+
+def test_model_cache_reuses_fits():
+    from datafusion_ml.fusion import clear_model_cache
+
+    A = pd.DataFrame({"age": [1, 2, 3, 4], "sex": ["m", "f", "m", "f"], "y": [0, 1, 0, 1]})
+    B = pd.DataFrame({"age": [2, 3, 4, 5], "sex": ["f", "m", "f", "m"], "x": [0.2, 0.3, 0.1, 0.4]})
+    cfg = FusionConfig(prefer_pycaret=False, cv_splits=2, n_estimators=10, cache_models=True)
+
+    clear_model_cache()
+    first = fuse_datasets(df_a=A, df_b=B, config=cfg)
+    second = fuse_datasets(df_a=A, df_b=B, config=cfg)
+    assert second.models_a_to_b["y"].model is first.models_a_to_b["y"].model
+    assert second.metrics_b_to_a == first.metrics_b_to_a
+
+    # Results are copies: changing one does not reach later cache hits
+    metric = next(iter(second.metrics_a_to_b["y"]))
+    expected = second.metrics_a_to_b["y"][metric]
+    second.metrics_a_to_b["y"][metric] = 999.0
+    second.models_a_to_b["y"].target = "changed"
+    third = fuse_datasets(df_a=A, df_b=B, config=cfg)
+    assert third.metrics_a_to_b["y"][metric] == expected
+    assert third.models_a_to_b["y"].target == "y"
+
+    changed = fuse_datasets(df_a=A.assign(age=A["age"] + 1), df_b=B, config=cfg)
+    assert changed.models_a_to_b["y"].model is not first.models_a_to_b["y"].model
+    clear_model_cache()
+
+
+def test_stack_frames_matches_reindexed_concat():
+    from datafusion_ml.fusion import _stack_frames
+
+    A = pd.DataFrame({"age": [1, 2], "sex": ["m", "f"], "y": [0, 1]}, index=[7, 8])
+    B = pd.DataFrame({"age": [2.5, 3.0], "sex": ["f", "m"], "x": [0.2, 0.3]})
+    cols = ["age", "sex", "x", "y"]
+
+    expected = pd.concat([A.reindex(columns=cols), B.reindex(columns=cols)], ignore_index=True)
+    pd.testing.assert_frame_equal(_stack_frames(A, B, cols), expected)
+
+
+def test_shared_encoding_matches_full_pipeline():
+    import numpy as np
+    from datafusion_ml.modeling import SklearnTrainer, encode_features, predict
+
+    X = pd.DataFrame({"age": [1, 2, 3, 4, 5, 6], "sex": ["m", "f", "m", "f", "m", "f"]})
+    X_apply = pd.DataFrame({"age": [2, 7], "sex": ["f", "x"]})
+    y = pd.Series([0.1, 0.5, 0.3, 0.9, 0.4, 0.8], name="y")
+    cfg = FusionConfig(prefer_pycaret=False, n_estimators=10)
+
+    encoded = encode_features(X, X_apply, config=cfg)
+    shared = SklearnTrainer().train(X, y, "regression", config=cfg, encoded=encoded)
+    full = SklearnTrainer().train(X, y, "regression", config=cfg)
+
+    np.testing.assert_allclose(predict(shared, X_apply, encoded=encoded), predict(full, X_apply))
+    np.testing.assert_allclose(predict(shared, X_apply), predict(full, X_apply))
+
+
+def test_hgbt_model_family_runs():
+    A = pd.DataFrame(
+        {
+            "age": [1, 2, None, 4, 5, 6, 7, 8],
+            "sex": ["m", "f", "m", None, "m", "f", "m", "f"],
+            "y": [0, 1, 0, 1, 0, 1, 0, 1],
+        }
+    )
+    B = pd.DataFrame({"age": [2, 3, 9], "sex": ["f", "x", "m"], "z": [0.1, 0.2, 0.3]})
+    cfg = FusionConfig(prefer_pycaret=False, model_family="hgbt", cv_splits=2, n_estimators=30)
+
+    result = fuse_datasets(df_a=A, df_b=B, config=cfg)
+    assert result.b_enriched["y"].notna().all()
+    assert "z" in result.a_enriched.columns
+
+
+def test_cv_metrics_skip_preprocessing_without_splits(monkeypatch):
+    from datafusion_ml import modeling
+
+    def _no_fit(*args, **kwargs):
+        raise AssertionError("preprocessor should not be built")
+
+    monkeypatch.setattr(modeling, "build_preprocessor", _no_fit)
+    X = pd.DataFrame({"age": [1, 2, 3, 4]})
+    y = pd.Series([0.1, 0.2, 0.3, 0.4])
+    assert modeling.cross_validate_metrics(X, y, "regression", config=FusionConfig(cv_splits=1)) == {}
+
+
+def test_failed_onnx_export_is_logged(caplog):
+    pytest.importorskip("skl2onnx")
+    from sklearn.linear_model import LinearRegression
+
+    from datafusion_ml.modeling import _export_onnx
+
+    # Unfitted, so conversion fails
+    with caplog.at_level("WARNING", logger="datafusion_ml.modeling"):
+        assert _export_onnx(LinearRegression()) is None
+    assert any("ONNX export of LinearRegression failed" in r.getMessage() for r in caplog.records)
+
+
+def test_failed_treelite_export_is_logged(caplog):
+    pytest.importorskip("treelite")
+    from sklearn.linear_model import LinearRegression
+
+    from datafusion_ml.modeling import _export_treelite
+
+    # Treelite only imports tree ensembles
+    with caplog.at_level("WARNING", logger="datafusion_ml.modeling"):
+        assert _export_treelite(LinearRegression().fit([[0.0], [1.0]], [0.0, 1.0])) is None
+    assert any("Treelite export of LinearRegression failed" in r.getMessage() for r in caplog.records)
+
+
+def test_missing_sklearnex_warns_and_falls_back(monkeypatch, caplog):
+    import sys
+
+    from sklearn.ensemble import RandomForestClassifier
+
+    from datafusion_ml.modeling import _get_rf_classes
+
+    monkeypatch.setitem(sys.modules, "sklearnex", None)  # import raises ImportError
+    _get_rf_classes.cache_clear()
+    try:
+        with caplog.at_level("WARNING", logger="datafusion_ml.modeling"):
+            assert _get_rf_classes(True)[0] is RandomForestClassifier
+            _get_rf_classes(True)
+    finally:
+        _get_rf_classes.cache_clear()
+    assert sum("scikit-learn-intelex" in r.getMessage() for r in caplog.records) == 1
+
+
+@pytest.mark.parametrize(
+    "flag, modules, handle",
+    [
+        ("use_onnx", ("skl2onnx", "onnxruntime"), "onnx_session"),
+        ("use_treelite", ("treelite",), "treelite_handle"),
+    ],
+)
+def test_compiled_predictions_match_sklearn(flag, modules, handle):
+    import numpy as np
+
+    for module in modules:
+        pytest.importorskip(module)
+    A = pd.DataFrame(
+        {"age": [1, 2, 3, 4, 5, 6], "sex": ["m", "f", "m", "f", "m", "f"], "y": [0, 1, 0, 1, 0, 1]}
+    )
+    B = pd.DataFrame({"age": [2, 3, 7], "sex": ["f", "x", "m"], "z": [0.1, 0.2, 0.3]})
+    kwargs = dict(prefer_pycaret=False, cv_splits=2, n_estimators=10)
+
+    compiled = fuse_datasets(df_a=A, df_b=B, config=FusionConfig(**{flag: True}, **kwargs))
+    plain = fuse_datasets(df_a=A, df_b=B, config=FusionConfig(**kwargs))
+
+    assert handle in compiled.models_a_to_b["y"].extra
+    assert compiled.b_enriched["y"].tolist() == plain.b_enriched["y"].tolist()
+    np.testing.assert_allclose(compiled.a_enriched["z"], plain.a_enriched["z"], rtol=1e-5)
+
+
+def test_ordinal_encoding_keeps_one_column_per_feature():
+    from datafusion_ml.modeling import encode_features
+
+    X = pd.DataFrame({"age": [1, 2, 3], "city": ["a", "b", "c"], "sex": ["m", "f", "m"]})
+    X_apply = pd.DataFrame({"age": [4], "city": ["z"], "sex": ["f"]})
+    cfg = FusionConfig(categorical_encoding="ordinal")
+
+    encoded = encode_features(X, X_apply, config=cfg)
+    assert encoded.train.shape == (3, 3)
+    assert encoded.apply[0, 0] == -1
+
+
+def test_fast_onehot_matches_sklearn():
+    import numpy as np
+    from sklearn.preprocessing import OneHotEncoder
+    from datafusion_ml.encoders import FastOneHotEncoder
+
+    X = np.array([["a", "x"], ["b", "y"], ["a", "z"]], dtype=object)
+    X_new = np.array([["c", "x"], ["b", "y"]], dtype=object)
+    fast = FastOneHotEncoder().fit(X)
+    ref = OneHotEncoder(handle_unknown="ignore", sparse_output=False).fit(X)
+
+    out = fast.transform(X_new)
+    assert out.dtype == np.int8
+    np.testing.assert_array_equal(out, ref.transform(X_new))
+
+
+def test_one_sided_targets_skip_copy():
+    A = pd.DataFrame({"age": [1, 2, 3, 4], "y": [0, 1, 0, 1]})
+    B = pd.DataFrame({"age": [2, 3, 4, 5]})
+    cfg = FusionConfig(prefer_pycaret=False, cv_splits=2, n_estimators=10)
+
+    result = fuse_datasets(df_a=A, df_b=B, config=cfg)
+    assert result.a_enriched is A
+    assert "y" in result.b_enriched.columns and "y" not in B.columns
 
 
 def test_no_overlap_raises():
     A = pd.DataFrame({"a": [1, 2, 3], "y": [0, 1, 0]})
     B = pd.DataFrame({"b": [1, 2, 3], "x": [0.1, 0.2, 0.3]})
-    import pytest
     from datafusion_ml.errors import OverlapError
-    with pytest.raises(OverlapError):
+    with pytest.raises(OverlapError, match="No overlapping features"):
         fuse_datasets(df_a=A, df_b=B, prefer_pycaret=False)
 
 
-def test_cli_smoke(tmp_path):
-    from subprocess import run
-    import sys
-
+def _cli_args(tmp_path) -> List[str]:
     A = pd.DataFrame({
         "age": [1, 2, 3],
         "sex": ["m", "f", "m"],
@@ -57,15 +272,31 @@ def test_cli_smoke(tmp_path):
     })
     a_path = tmp_path / "a.csv"
     b_path = tmp_path / "b.csv"
-    fused_path = tmp_path / "fused.csv"
-    metrics_path = tmp_path / "metrics.json"
     A.to_csv(a_path, index=False)
     B.to_csv(b_path, index=False)
+    return ["--a", str(a_path), "--b", str(b_path), "--out-fused", str(tmp_path / "fused.csv"), "--no-pycaret", "--metrics-out", str(tmp_path / "metrics.json"), "--cv-splits", "2", "--n-estimators", "10", "--sparse-onehot"]
 
-    # Invoke CLI via module entrypoint
-    cmd = [sys.executable, "-m", "datafusion_ml.cli", "--a", str(a_path), "--b", str(b_path), "--out-fused", str(fused_path), "--no-pycaret", "--metrics-out", str(metrics_path), "--cv-splits", "2", "--n-estimators", "10", "--sparse-onehot"]
+
+def test_cli_smoke(tmp_path, monkeypatch):
+    import sys
+
+    from datafusion_ml.cli import main
+
+    # Run the CLI in-process; the package is already imported
+    monkeypatch.setattr(sys, "argv", ["datafusion-ml", *_cli_args(tmp_path)])
+    main()
+    assert (tmp_path / "fused.csv").exists()
+    assert (tmp_path / "metrics.json").exists()
+
+
+@pytest.mark.slow
+def test_cli_module_entrypoint(tmp_path):
+    from subprocess import run
+    import sys
+
+    # End to end through a fresh interpreter
+    cmd = [sys.executable, "-m", "datafusion_ml.cli", *_cli_args(tmp_path)]
     res = run(cmd, capture_output=True, text=True)
     assert res.returncode == 0, res.stderr
-    assert fused_path.exists()
-    assert metrics_path.exists()
-
+    assert (tmp_path / "fused.csv").exists()
+    assert (tmp_path / "metrics.json").exists()